@@ -0,0 +1,69 @@
+from typing import List, Tuple
+import numpy as np
+import math
+
+# Numeric kernels over struct-of-arrays receipt data used by AggregationAlgorithms
+# Every kernel runs as a fixed number of whole-array NumPy passes (no per-row Python)
+
+# 1970-01-01 was a Thursday; weekday() numbering has Monday as 0
+_EPOCH_WEEKDAY = 3
+
+def basic_stats_kernel(ordered: np.ndarray) -> Tuple[int, float, float, float, float, float, float]:
+    """
+    Compute (count, total, mean, median, min, max, sample std) of a sorted non-empty float64 array
+    Order statistics are read by index from the sorted array
+    """
+    count = int(ordered.size)
+    total = float(ordered.sum())
+    mean = total / count
+    middle = count // 2
+    median = float(ordered[middle]) if count % 2 else float((ordered[middle - 1] + ordered[middle]) / 2)
+    min_amount = float(ordered[0])
+    max_amount = float(ordered[-1])
+
+    # Sample std from the mean already computed; np.std would recompute it in an extra pass
+    if count > 1:
+        deviations = ordered - mean
+        std = math.sqrt(float(deviations @ deviations) / (count - 1))
+    else:
+        std = 0.0
+
+    return count, total, mean, median, min_amount, max_amount, std
+
+def mode_kernel(ordered: np.ndarray, decimals: int = 2) -> Tuple[List[float], int]:
+    """
+    Find the most frequent value(s) of a sorted non-empty array after rounding
+    Rounding is monotonic, so equal values stay adjacent and are counted as runs
+    """
+    rounded = np.round(ordered, decimals)
+    run_starts = np.concatenate(([0], np.flatnonzero(rounded[1:] != rounded[:-1]) + 1))
+    run_lengths = np.diff(np.append(run_starts, rounded.size))
+    max_frequency = int(run_lengths.max())
+
+    if max_frequency == 1:
+        # No value repeats; report the smallest rather than every value as a mode
+        return rounded[:1].tolist(), 1
+
+    return rounded[run_starts[run_lengths == max_frequency]].tolist(), max_frequency
+
+def bucket_sum_count(bucket_idx: np.ndarray, amounts: np.ndarray, n_buckets: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sum and count amounts per bucket index in [0, n_buckets)
+    Returns (totals, counts) arrays of length n_buckets
+    """
+    totals = np.bincount(bucket_idx, weights=amounts, minlength=n_buckets)
+    counts = np.bincount(bucket_idx, minlength=n_buckets)
+
+    return totals, counts
+
+def date_parts(days: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Split a datetime64[D] array into (years, months, weekdays) integer arrays
+    Weekdays use Python's numbering (0=Monday)
+    """
+    month_index = days.astype('datetime64[M]').astype(np.int64)
+    years = (month_index // 12 + 1970).astype(np.int32)
+    months = (month_index % 12 + 1).astype(np.int32)
+    weekdays = ((days.astype(np.int64) + _EPOCH_WEEKDAY) % 7).astype(np.int8)
+
+    return years, months, weekdays
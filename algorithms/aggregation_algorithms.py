@@ -1,11 +1,140 @@
-from typing import List, Dict, Any, Optional
-from models.database import Receipt
-from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
+from typing import List, Dict, Any, Optional, Union, Tuple
+from models.database import Receipt, ReceiptRow
+from algorithms._kernels import basic_stats_kernel, bucket_sum_count, date_parts, mode_kernel
+from sqlalchemy.orm import Session, Query
+from sqlalchemy import func, extract, desc, case
 from datetime import datetime, timedelta
-from collections import Counter, defaultdict
-import statistics
+from collections import defaultdict, OrderedDict
+from dataclasses import dataclass
+from operator import attrgetter
+import numpy as np
 import calendar
+import copy
+import heapq
+import threading
+import weakref
+
+@dataclass
+class ReceiptColumns:
+    """
+    Struct-of-arrays view of receipts, extracted once and shared by every aggregation
+    Vendors and categories are factorized into integer codes in first-seen order
+    """
+    amounts: np.ndarray         # float64, NaN where the amount is missing
+    dates: np.ndarray           # datetime64[D], NaT where the date is missing
+    vendor_codes: np.ndarray    # index into vendor_names
+    vendor_names: List[str]
+    category_codes: np.ndarray  # index into category_names
+    category_names: List[str]
+    
+    def __len__(self) -> int:
+        return int(self.amounts.size)
+
+# Proleptic ordinal of 1970-01-01, the datetime64 epoch
+_EPOCH_ORDINAL = datetime(1970, 1, 1).toordinal()
+_NAT = np.iinfo(np.int64).min
+
+def extract_columns(receipts: List[Receipt]) -> ReceiptColumns:
+    """
+    Read each receipt attribute exactly once into parallel arrays
+    Attribute reads run in C through attrgetter; labels are hashed once per distinct value
+    """
+    vendors = list(map(attrgetter('vendor'), receipts))
+    categories = list(map(attrgetter('category'), receipts))
+    vendor_codes, vendor_names = _factorize(vendors, 'Unknown')
+    category_codes, category_names = _factorize(categories, 'Uncategorized')
+    
+    return ReceiptColumns(
+        amounts=np.array(list(map(attrgetter('amount'), receipts)), dtype=np.float64),
+        dates=_day_numbers(list(map(attrgetter('transaction_date'), receipts))),
+        vendor_codes=vendor_codes,
+        vendor_names=vendor_names,
+        category_codes=category_codes,
+        category_names=category_names
+    )
+
+def _day_numbers(dates: List[Optional[datetime]]) -> np.ndarray:
+    """
+    Convert dates to datetime64[D] (NaT where missing) through toordinal
+    NumPy's own conversion of datetime objects costs about 1 us per element
+    """
+    days = np.fromiter(
+        (_NAT if value is None else value.toordinal() - _EPOCH_ORDINAL for value in dates),
+        dtype=np.int64,
+        count=len(dates)
+    )
+    return days.view('datetime64[D]')
+
+def _factorize(values: List[Optional[str]], default: str) -> Tuple[np.ndarray, List[str]]:
+    """
+    Encode labels as integer codes in first-seen order; empty values share the default label
+    Returns (codes, names)
+    """
+    label_codes: Dict[str, int] = {}
+    raw_codes = {raw: label_codes.setdefault(raw or default, len(label_codes)) for raw in dict.fromkeys(values)}
+    codes = np.fromiter(map(raw_codes.__getitem__, values), dtype=np.intp, count=len(values))
+    
+    return codes, list(label_codes)
+
+class RunningAggregates:
+    """
+    Per-bucket running totals for processed receipts
+    Seeded from GROUP BY queries, then updated in O(1) per receipt write
+    """
+    
+    def __init__(self):
+        self.monthly: Dict[Tuple[int, int], List] = {}  # (year, month) -> [total, count]
+        self.weekday: Dict[int, List] = {}              # 0=Monday -> [total, count]
+        self.vendors: Dict[str, List] = {}              # vendor -> [total, count]
+        self.categories: Dict[str, int] = {}
+        self.receipt_count = 0
+        self.fingerprint: Optional[Tuple] = None
+    
+    def apply(self, row: ReceiptRow, sign: int):
+        """Add (sign=1) or remove (sign=-1) one processed receipt"""
+        self.receipt_count += sign
+        self._bump(self.vendors, row.vendor or 'Unknown', (row.amount or 0.0) * sign, sign)
+        
+        category = row.category or 'Uncategorized'
+        self.categories[category] = self.categories.get(category, 0) + sign
+        if self.categories[category] <= 0:
+            del self.categories[category]
+        
+        # Time series only count dated receipts with a non-zero amount
+        if row.transaction_date and row.amount:
+            date = row.transaction_date
+            self._bump(self.monthly, (date.year, date.month), row.amount * sign, sign)
+            self._bump(self.weekday, date.weekday(), row.amount * sign, sign)
+    
+    def copy(self) -> 'RunningAggregates':
+        """Snapshot the buckets so readers never see a write in progress"""
+        snapshot = RunningAggregates()
+        snapshot.monthly = {key: list(bucket) for key, bucket in self.monthly.items()}
+        snapshot.weekday = {key: list(bucket) for key, bucket in self.weekday.items()}
+        snapshot.vendors = {key: list(bucket) for key, bucket in self.vendors.items()}
+        snapshot.categories = dict(self.categories)
+        snapshot.receipt_count = self.receipt_count
+        snapshot.fingerprint = self.fingerprint
+        return snapshot
+    
+    @staticmethod
+    def _bump(buckets: Dict[Any, List], key: Any, amount: float, count: int):
+        """Adjust one [total, count] bucket, dropping it once empty"""
+        bucket = buckets.setdefault(key, [0.0, 0])
+        bucket[0] += amount
+        bucket[1] += count
+        if bucket[1] <= 0:
+            del buckets[key]
+
+# Aggregations accept materialized receipts, projected rows, extracted columns, running
+# aggregates or a filtered Query; a Query is aggregated inside the database with GROUP BY
+ReceiptSource = Union[List[Receipt], List[ReceiptRow], ReceiptColumns, RunningAggregates, Query]
+
+# Rows fetched per round trip when streaming projected receipts
+ROW_BATCH_SIZE = 10_000
+
+# Maximum number of memoized comprehensive analyses
+ANALYSIS_CACHE_SIZE = 32
 
 class AggregationAlgorithms:
     """
@@ -13,60 +142,246 @@ class AggregationAlgorithms:
     Includes sum, mean, median, mode, histograms, and time-series analysis
     """
     
+    # LRU cache of comprehensive analyses shared across request-scoped instances
+    _analysis_cache: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+    _analysis_cache_lock = threading.Lock()
+    
+    # Running bucket totals of processed receipts, one per database engine
+    _running_aggregates = weakref.WeakKeyDictionary()
+    _running_aggregates_lock = threading.Lock()
+    
     def __init__(self, db: Session):
         self.db = db
     
-    def calculate_basic_stats(self, receipts: List[Receipt]) -> Dict[str, Any]:
+    @classmethod
+    def clear_analysis_cache(cls):
+        """Invalidate memoized analyses after receipts are written"""
+        with cls._analysis_cache_lock:
+            cls._analysis_cache.clear()
+    
+    @staticmethod
+    def snapshot(receipt: Optional[Receipt]) -> Optional[ReceiptRow]:
+        """Capture the aggregated fields of a processed receipt before or after a write"""
+        if receipt is None or receipt.processing_status != "processed":
+            return None
+        return ReceiptRow(receipt.id, receipt.vendor, receipt.category, receipt.amount, receipt.transaction_date)
+    
+    @classmethod
+    def record_receipt_change(cls, db: Session, before: Optional[ReceiptRow], after: Optional[ReceiptRow]):
+        """
+        Propagate one committed receipt write into the running aggregates
+        Pass snapshots taken before and after the write (None when absent or unprocessed)
+        """
+        engine = db.get_bind()
+        if engine not in cls._running_aggregates:
+            return
+        
+        # Query outside the lock so analytics readers never wait on this round trip
+        algorithms = cls(db)
+        fingerprint = algorithms._fingerprint(algorithms._processed_query())
+        
+        with cls._running_aggregates_lock:
+            running = cls._running_aggregates.get(engine)
+            if running is None:
+                return
+            
+            if before is not None:
+                running.apply(before, -1)
+            if after is not None:
+                running.apply(after, 1)
+            running.fingerprint = fingerprint
+    
+    def running_aggregates(self) -> RunningAggregates:
+        """
+        Return running bucket totals for processed receipts
+        Reseeds from the database when processed rows were added or removed outside the write hooks;
+        edits to existing rows are only seen through record_receipt_change
+        """
+        processed = self._processed_query()
+        fingerprint = self._fingerprint(processed)
+        engine = self.db.get_bind()
+        cls = type(self)
+        
+        with cls._running_aggregates_lock:
+            running = cls._running_aggregates.get(engine)
+            if running is None or running.fingerprint != fingerprint:
+                running = self._seed_running_aggregates(processed)
+                running.fingerprint = fingerprint
+                cls._running_aggregates[engine] = running
+            return running.copy()
+    
+    def _processed_query(self) -> Query:
+        """Receipts that feed the analytics endpoints"""
+        return self.db.query(Receipt).filter(Receipt.processing_status == "processed")
+    
+    def _fingerprint(self, query: Query) -> Tuple:
+        """Cheap change detector: (count, max id, max upload date) in one round trip"""
+        return tuple(query.with_entities(
+            func.count(Receipt.id),
+            func.max(Receipt.id),
+            func.max(Receipt.upload_date)
+        ).order_by(None).one())
+    
+    def _seed_running_aggregates(self, query: Query) -> RunningAggregates:
+        """Build every running bucket from GROUP BY queries"""
+        running = RunningAggregates()
+        
+        for year, month, total, count in self._sql_monthly_totals(query):
+            running.monthly[(year, month)] = [total, count]
+        for day, (total, count) in self._sql_weekday_totals(query).items():
+            running.weekday[day] = [total, count]
+        
+        vendor = self._label_expression(Receipt.vendor, 'Unknown')
+        for name, total, count in query.with_entities(
+            vendor, func.coalesce(func.sum(Receipt.amount), 0.0), func.count(Receipt.id)
+        ).group_by(vendor):
+            running.vendors[name] = [float(total), count]
+        
+        category = self._label_expression(Receipt.category, 'Uncategorized')
+        for name, count in query.with_entities(category, func.count(Receipt.id)).group_by(category):
+            running.categories[name] = count
+        
+        running.receipt_count = sum(running.categories.values())
+        return running
+    
+    def load_receipt_rows(self, query: Query) -> List[ReceiptRow]:
+        """
+        Materialize only the aggregation columns of a receipts query
+        Avoids hydrating full ORM objects for in-memory aggregation
+        """
+        projected = query.with_entities(
+            Receipt.id,
+            Receipt.vendor,
+            Receipt.category,
+            Receipt.amount,
+            Receipt.transaction_date
+        ).yield_per(ROW_BATCH_SIZE)
+        
+        return [ReceiptRow(*row) for row in projected]
+    
+    def _as_columns(self, receipts: ReceiptSource) -> ReceiptColumns:
+        """Extract receipt columns unless the caller already did"""
+        if isinstance(receipts, ReceiptColumns):
+            return receipts
+        return extract_columns(receipts)
+    
+    def calculate_basic_stats(self, receipts: ReceiptSource) -> Dict[str, Any]:
         """
         Calculate basic statistical aggregates for receipt amounts
         Returns: sum, mean, median, mode, min, max, count
         """
+        if isinstance(receipts, Query):
+            return self._sql_basic_stats(receipts)
+        
         if not receipts:
             return self._empty_stats()
         
-        # Extract amounts, filtering out None values
-        amounts = [r.amount for r in receipts if r.amount is not None]
+        # Take the contiguous float64 amounts column, filtering out missing values
+        columns = self._as_columns(receipts)
+        amounts = columns.amounts[~np.isnan(columns.amounts)]
         
-        if not amounts:
+        if not amounts.size:
             return self._empty_stats()
         
-        # Calculate statistics
-        total_sum = sum(amounts)
-        count = len(amounts)
-        mean = total_sum / count
-        
-        # Sort for median calculation
-        sorted_amounts = sorted(amounts)
-        median = statistics.median(sorted_amounts)
+        # Sort once; median, min, max and mode are all read off the sorted array
+        ordered = np.sort(amounts)
+        count, total_sum, mean, median, min_amount, max_amount, std = basic_stats_kernel(ordered)
         
         # Mode calculation
-        mode_result = self._calculate_mode(amounts)
+        mode_result = self._calculate_mode(ordered)
         
         return {
-            'total_receipts': len(receipts),
+            'total_receipts': len(columns),
             'receipts_with_amounts': count,
             'total_amount': round(total_sum, 2),
             'average_amount': round(mean, 2),
             'median_amount': round(median, 2),
             'mode_amount': mode_result,
-            'min_amount': round(min(amounts), 2),
-            'max_amount': round(max(amounts), 2),
-            'amount_range': round(max(amounts) - min(amounts), 2),
-            'standard_deviation': round(statistics.stdev(amounts) if count > 1 else 0, 2)
+            'min_amount': round(min_amount, 2),
+            'max_amount': round(max_amount, 2),
+            'amount_range': round(max_amount - min_amount, 2),
+            'standard_deviation': round(std, 2)
+        }
+    
+    def _sql_basic_stats(self, query: Query) -> Dict[str, Any]:
+        """Basic statistics computed with a single aggregate SELECT"""
+        total_receipts, count, total_sum, min_amount, max_amount, sum_squares = query.with_entities(
+            func.count(Receipt.id),
+            func.count(Receipt.amount),
+            func.sum(Receipt.amount),
+            func.min(Receipt.amount),
+            func.max(Receipt.amount),
+            func.sum(Receipt.amount * Receipt.amount)
+        ).one()
+        
+        if not count:
+            stats = self._empty_stats()
+            stats['total_receipts'] = total_receipts
+            return stats
+        
+        total_sum = float(total_sum)
+        mean = total_sum / count
+        
+        # Sample variance from the running sums, clamped against rounding error
+        variance = (float(sum_squares) - total_sum * mean) / (count - 1) if count > 1 else 0.0
+        
+        return {
+            'total_receipts': total_receipts,
+            'receipts_with_amounts': count,
+            'total_amount': round(total_sum, 2),
+            'average_amount': round(mean, 2),
+            'median_amount': round(self._sql_median(query, count), 2),
+            'mode_amount': self._sql_mode(query),
+            'min_amount': round(float(min_amount), 2),
+            'max_amount': round(float(max_amount), 2),
+            'amount_range': round(float(max_amount) - float(min_amount), 2),
+            'standard_deviation': round(max(variance, 0.0) ** 0.5, 2)
         }
     
-    def _calculate_mode(self, amounts: List[float]) -> Dict[str, Any]:
-        """Calculate mode with frequency information"""
-        if not amounts:
+    def _sql_median(self, query: Query, count: int) -> float:
+        """Fetch only the middle one or two amounts using ORDER BY ... OFFSET"""
+        middle = query.with_entities(Receipt.amount).filter(
+            Receipt.amount.isnot(None)
+        ).order_by(Receipt.amount).offset((count - 1) // 2).limit(2 - count % 2).all()
+        
+        values = [float(amount) for (amount,) in middle]
+        return sum(values) / len(values)
+    
+    def _sql_mode(self, query: Query) -> Dict[str, Any]:
+        """Calculate mode from per-value counts grouped in the database"""
+        rounded = func.round(Receipt.amount, 2)
+        frequencies = query.with_entities(
+            rounded.label('value'), func.count(Receipt.id).label('frequency')
+        ).filter(Receipt.amount.isnot(None)).group_by(rounded).order_by(desc('frequency'), 'value')
+        
+        modes = []
+        max_frequency = 0
+        for value, frequency in frequencies:
+            if frequency < max_frequency:
+                break
+            max_frequency = frequency
+            modes.append(float(value))
+            if frequency == 1:
+                # No value repeats; report the smallest instead of streaming every row
+                break
+        
+        if not modes:
             return {'value': None, 'frequency': 0}
         
-        # Round amounts to 2 decimal places for mode calculation
-        rounded_amounts = [round(amount, 2) for amount in amounts]
-        counter = Counter(rounded_amounts)
+        modes.sort()
+        return {
+            'value': modes[0] if len(modes) == 1 else modes,
+            'frequency': max_frequency,
+            'is_multimodal': len(modes) > 1
+        }
+    
+    def _calculate_mode(self, ordered: np.ndarray) -> Dict[str, Any]:
+        """Calculate mode with frequency information from sorted amounts"""
+        if not ordered.size:
+            return {'value': None, 'frequency': 0}
         
-        # Find the most common value(s)
-        max_frequency = max(counter.values())
-        modes = [amount for amount, freq in counter.items() if freq == max_frequency]
+        # Count runs of equal amounts rounded to 2 decimal places
+        modes, max_frequency = mode_kernel(ordered)
         
         return {
             'value': modes[0] if len(modes) == 1 else modes,
@@ -89,127 +404,213 @@ class AggregationAlgorithms:
             'standard_deviation': 0.0
         }
     
-    def vendor_frequency_distribution(self, receipts: List[Receipt]) -> List[Dict[str, Any]]:
+    def vendor_frequency_distribution(self, receipts: ReceiptSource) -> List[Dict[str, Any]]:
         """
         Calculate frequency distribution of vendors (histogram)
         Returns sorted list of vendors with counts and percentages
         """
-        if not receipts:
-            return []
+        if isinstance(receipts, Query):
+            return self._sql_frequency_distribution(receipts, Receipt.vendor, 'vendor', 'Unknown')
         
-        # Count vendor occurrences
-        vendor_counts = Counter()
-        total_receipts = len(receipts)
+        if isinstance(receipts, RunningAggregates):
+            counts = {vendor: count for vendor, (_, count) in receipts.vendors.items()}
+            return self._running_frequency_distribution(counts, receipts.receipt_count, 'vendor')
         
-        for receipt in receipts:
-            vendor = receipt.vendor or 'Unknown'
-            vendor_counts[vendor] += 1
-        
-        # Convert to list with percentages
-        distribution = []
-        for vendor, count in vendor_counts.most_common():
-            percentage = (count / total_receipts) * 100
-            distribution.append({
-                'vendor': vendor,
-                'count': count,
-                'percentage': round(percentage, 2)
-            })
+        if not receipts:
+            return []
         
-        return distribution
+        columns = self._as_columns(receipts)
+        return self._code_frequency_distribution(columns.vendor_codes, columns.vendor_names, 'vendor')
     
-    def category_frequency_distribution(self, receipts: List[Receipt]) -> List[Dict[str, Any]]:
+    def category_frequency_distribution(self, receipts: ReceiptSource) -> List[Dict[str, Any]]:
         """
         Calculate frequency distribution of categories
         Returns sorted list of categories with counts and percentages
         """
+        if isinstance(receipts, Query):
+            return self._sql_frequency_distribution(receipts, Receipt.category, 'category', 'Uncategorized')
+        
+        if isinstance(receipts, RunningAggregates):
+            return self._running_frequency_distribution(receipts.categories, receipts.receipt_count, 'category')
+        
         if not receipts:
             return []
         
-        # Count category occurrences
-        category_counts = Counter()
-        total_receipts = len(receipts)
+        columns = self._as_columns(receipts)
+        return self._code_frequency_distribution(columns.category_codes, columns.category_names, 'category')
+    
+    def _running_frequency_distribution(self, counts: Dict[str, int], total_receipts: int, label: str) -> List[Dict[str, Any]]:
+        """Rank running bucket counts like the GROUP BY path (count desc, then value)"""
+        ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+        return self._build_frequency_rows(ranked, total_receipts, label)
+    
+    def _code_frequency_distribution(self, codes: np.ndarray, names: List[str], label: str) -> List[Dict[str, Any]]:
+        """Rank factorized values by frequency with percentages"""
+        counts = np.bincount(codes, minlength=len(names))
         
-        for receipt in receipts:
-            category = receipt.category or 'Uncategorized'
-            category_counts[category] += 1
+        # Most common first; ties keep first-seen order like Counter.most_common
+        order = np.argsort(-counts, kind='stable').tolist()
+        ranked = [(names[code], count) for code, count in zip(order, counts[order].tolist())]
         
-        # Convert to list with percentages
-        distribution = []
-        for category, count in category_counts.most_common():
-            percentage = (count / total_receipts) * 100
-            distribution.append({
-                'category': category,
+        return self._build_frequency_rows(ranked, int(codes.size), label)
+    
+    def _build_frequency_rows(self, ranked: List[Tuple[str, int]], total_receipts: int, label: str) -> List[Dict[str, Any]]:
+        """Attach percentages to ranked (value, count) pairs"""
+        # One vectorized division and rounding for every percentage
+        count_array = np.fromiter((count for _, count in ranked), dtype=np.float64, count=len(ranked))
+        percentages = self._round_array(count_array / total_receipts * 100)
+        
+        return [
+            {
+                label: value,
                 'count': count,
-                'percentage': round(percentage, 2)
-            })
+                'percentage': percentage
+            }
+            for (value, count), percentage in zip(ranked, percentages)
+        ]
+    
+    def _round_array(self, values: np.ndarray, decimals: int = 2) -> List[float]:
+        """Round a whole column of floats in one vectorized call"""
+        return np.round(np.asarray(values, dtype=np.float64), decimals).tolist()
+    
+    def _sql_frequency_distribution(self, query: Query, column, label: str, default: str) -> List[Dict[str, Any]]:
+        """Frequency distribution of a text column using GROUP BY"""
+        key = self._label_expression(column, default)
+        rows = query.with_entities(
+            key.label(label), func.count(Receipt.id).label('count')
+        ).group_by(key).order_by(desc('count'), key).all()
+        
+        total_receipts = sum(count for _, count in rows)
         
-        return distribution
+        return self._build_frequency_rows(rows, total_receipts, label)
+    
+    def _label_expression(self, column, default: str):
+        """SQL equivalent of `value or default` for text columns"""
+        return func.coalesce(func.nullif(column, ''), default)
     
-    def top_vendors_by_amount(self, receipts: List[Receipt], limit: int = 10) -> List[Dict[str, Any]]:
+    def top_vendors_by_amount(self, receipts: ReceiptSource, limit: int = 10) -> List[Dict[str, Any]]:
         """
         Get top vendors by total spending amount
         Returns list of vendors with total amounts and transaction counts
         """
+        if isinstance(receipts, Query):
+            return self._sql_top_vendors_by_amount(receipts, limit)
+        
+        if isinstance(receipts, RunningAggregates):
+            top = heapq.nlargest(limit, receipts.vendors.items(), key=lambda item: item[1][0])
+            return self._build_vendor_rows(
+                [vendor for vendor, _ in top],
+                np.array([total for _, (total, _) in top], dtype=np.float64),
+                np.array([count for _, (_, count) in top], dtype=np.int64)
+            )
+        
         if not receipts:
             return []
         
-        # Aggregate by vendor
-        vendor_totals = defaultdict(lambda: {'total': 0.0, 'count': 0})
-        
-        for receipt in receipts:
-            vendor = receipt.vendor or 'Unknown'
-            amount = receipt.amount or 0.0
-            
-            vendor_totals[vendor]['total'] += amount
-            vendor_totals[vendor]['count'] += 1
+        # Per-vendor totals and counts with missing amounts counted as zero
+        columns = self._as_columns(receipts)
+        vendors = columns.vendor_names
+        totals = np.bincount(columns.vendor_codes, weights=np.nan_to_num(columns.amounts), minlength=len(vendors))
+        counts = np.bincount(columns.vendor_codes, minlength=len(vendors))
+        rounded_totals = np.round(totals, 2).tolist()
+        
+        # Select the top `limit` by rounded total in O(V log limit); ties keep first-seen order
+        order = np.array(
+            heapq.nlargest(limit, range(len(vendors)), key=rounded_totals.__getitem__),
+            dtype=np.intp
+        )
+        return self._build_vendor_rows(
+            [vendors[i] for i in order.tolist()], totals[order], counts[order]
+        )
+    
+    def _build_vendor_rows(self, vendors: List[str], totals: np.ndarray, counts: np.ndarray) -> List[Dict[str, Any]]:
+        """Format ranked vendor totals with rounded totals and averages"""
+        averages = np.divide(totals, counts, out=np.zeros_like(totals), where=counts > 0)
         
-        # Convert to sorted list
-        top_vendors = []
-        for vendor, data in vendor_totals.items():
-            avg_amount = data['total'] / data['count'] if data['count'] > 0 else 0
-            top_vendors.append({
+        return [
+            {
                 'vendor': vendor,
-                'total_amount': round(data['total'], 2),
-                'transaction_count': data['count'],
-                'average_amount': round(avg_amount, 2)
-            })
-        
-        # Sort by total amount (descending) and limit results
-        top_vendors.sort(key=lambda x: x['total_amount'], reverse=True)
-        return top_vendors[:limit]
+                'total_amount': total,
+                'transaction_count': count,
+                'average_amount': average
+            }
+            for vendor, total, count, average in zip(
+                vendors, self._round_array(totals), counts.tolist(), self._round_array(averages)
+            )
+        ]
+    
+    def _sql_top_vendors_by_amount(self, query: Query, limit: int) -> List[Dict[str, Any]]:
+        """Top vendors by spending using GROUP BY ... ORDER BY ... LIMIT"""
+        vendor = self._label_expression(Receipt.vendor, 'Unknown')
+        total = func.coalesce(func.sum(Receipt.amount), 0.0)
+        rows = query.with_entities(
+            vendor, total, func.count(Receipt.id)
+        ).group_by(vendor).order_by(total.desc()).limit(limit).all()
+        
+        return self._build_vendor_rows(
+            [name for name, _, _ in rows],
+            np.array([amount for _, amount, _ in rows], dtype=np.float64),
+            np.array([count for _, _, count in rows], dtype=np.int64)
+        )
+    
+    def _dated_amounts(self, query: Query) -> Query:
+        """Restrict a query to receipts usable for time-series analysis"""
+        return query.filter(
+            Receipt.transaction_date.isnot(None),
+            Receipt.amount.isnot(None),
+            Receipt.amount != 0
+        )
     
-    def monthly_spending_trends(self, receipts: List[Receipt]) -> List[Dict[str, Any]]:
+    def _sql_monthly_totals(self, query: Query) -> List[Tuple[int, int, float, int]]:
+        """Return (year, month, total, count) rows grouped by calendar month"""
+        year = extract('year', Receipt.transaction_date)
+        month = extract('month', Receipt.transaction_date)
+        rows = self._dated_amounts(query).with_entities(
+            year, month, func.sum(Receipt.amount), func.count(Receipt.id)
+        ).group_by(year, month).all()
+        
+        return sorted((int(y), int(m), float(total), count) for y, m, total, count in rows)
+    
+    def monthly_spending_trends(self, receipts: ReceiptSource) -> List[Dict[str, Any]]:
         """
         Calculate monthly spending trends using time-series aggregation
         Returns list of monthly totals with moving averages
         """
-        if not receipts:
+        if isinstance(receipts, Query):
+            monthly_data = {
+                f"{year}-{month:02d}": {'total': total, 'count': count}
+                for year, month, total, count in self._sql_monthly_totals(receipts)
+            }
+        elif isinstance(receipts, RunningAggregates):
+            monthly_data = {
+                f"{year}-{month:02d}": {'total': total, 'count': count}
+                for (year, month), (total, count) in receipts.monthly.items()
+            }
+        else:
+            monthly_data = self._group_by_month(self._time_arrays(self._as_columns(receipts)))
+        
+        return self._format_monthly_trends(monthly_data)
+    
+    def _format_monthly_trends(self, monthly_data: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Build the monthly trend list from per-month totals and counts"""
+        if not monthly_data:
             return []
         
-        # Group receipts by month
-        monthly_data = defaultdict(lambda: {'total': 0.0, 'count': 0})
-        
-        for receipt in receipts:
-            if receipt.transaction_date and receipt.amount:
-                # Use transaction_date, fallback to upload_date
-                date = receipt.transaction_date
-                month_key = f"{date.year}-{date.month:02d}"
-                
-                monthly_data[month_key]['total'] += receipt.amount
-                monthly_data[month_key]['count'] += 1
-        
         # Convert to sorted list
+        months = sorted(monthly_data.items())
+        totals, averages = self._rounded_totals_and_averages([data for _, data in months])
+        
         trends = []
-        for month_key, data in sorted(monthly_data.items()):
+        for (month_key, data), total, average in zip(months, totals, averages):
             year, month = map(int, month_key.split('-'))
             month_name = calendar.month_name[month]
             
             trends.append({
                 'month': month_key,
                 'month_name': f"{month_name} {year}",
-                'total_amount': round(data['total'], 2),
+                'total_amount': total,
                 'transaction_count': data['count'],
-                'average_amount': round(data['total'] / data['count'], 2)
+                'average_amount': average
             })
         
         # Add moving averages
@@ -217,136 +618,274 @@ class AggregationAlgorithms:
         
         return trends
     
+    def _rounded_totals_and_averages(self, buckets: List[Dict[str, Any]]) -> Tuple[List[float], List[float]]:
+        """Round bucket totals and per-transaction averages in one vectorized pass"""
+        totals = np.array([data['total'] for data in buckets], dtype=np.float64)
+        counts = np.array([data['count'] for data in buckets], dtype=np.float64)
+        averages = np.divide(totals, counts, out=np.zeros_like(totals), where=counts > 0)
+        
+        return self._round_array(totals), self._round_array(averages)
+    
+    def _time_arrays(self, columns: ReceiptColumns) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Select (years, months, weekdays, amounts) arrays for time-series analysis
+        Only receipts with a transaction date and a non-zero amount are kept
+        """
+        amounts = columns.amounts
+        dated = ~np.isnat(columns.dates) & ~np.isnan(amounts) & (amounts != 0)
+        
+        # Derive every calendar field with array arithmetic
+        years, months, weekdays = date_parts(columns.dates[dated])
+        
+        return years, months, weekdays, amounts[dated]
+    
+    def _bucket_sums(self, keys: np.ndarray, amounts: np.ndarray) -> Dict[int, Dict[str, Any]]:
+        """Sum and count amounts per integer bucket key with np.bincount"""
+        if not keys.size:
+            return {}
+        
+        base = int(keys.min())
+        offsets = keys - base
+        totals, counts = bucket_sum_count(offsets, amounts, int(offsets.max()) + 1)
+        
+        return {
+            base + offset: {'total': float(totals[offset]), 'count': int(counts[offset])}
+            for offset in np.flatnonzero(counts).tolist()
+        }
+    
+    def _group_by_month(self, time_arrays: Tuple[np.ndarray, ...]) -> Dict[str, Dict[str, Any]]:
+        """Group extracted receipt arrays by month"""
+        years, months, _, amounts = time_arrays
+        buckets = self._bucket_sums(years * 12 + (months - 1), amounts)
+        
+        return {
+            f"{key // 12}-{key % 12 + 1:02d}": data
+            for key, data in buckets.items()
+        }
+    
+    def _group_by_quarter(self, time_arrays: Tuple[np.ndarray, ...]) -> Dict[str, Dict[str, Any]]:
+        """Group extracted receipt arrays by quarter"""
+        years, months, _, amounts = time_arrays
+        buckets = self._bucket_sums(years * 4 + (months - 1) // 3, amounts)
+        
+        return {
+            f"{key // 4}-Q{key % 4 + 1}": data
+            for key, data in buckets.items()
+        }
+    
+    def _group_by_weekday(self, time_arrays: Tuple[np.ndarray, ...]) -> Dict[int, Dict[str, Any]]:
+        """Group extracted receipt arrays by day of week (0=Monday)"""
+        _, _, weekdays, amounts = time_arrays
+        totals, counts = bucket_sum_count(weekdays, amounts, 7)
+        
+        return {
+            day: {'total': total, 'count': count}
+            for day, (total, count) in enumerate(zip(totals.tolist(), counts.tolist()))
+        }
+    
     def _add_moving_averages(self, trends: List[Dict[str, Any]], window: int = 3):
         """Add moving averages to time series data"""
         if len(trends) < window:
             return
         
-        for i in range(len(trends)):
-            # Calculate moving average for current position
-            start_idx = max(0, i - window + 1)
-            end_idx = i + 1
-            
-            window_data = trends[start_idx:end_idx]
-            if len(window_data) >= 2:  # Need at least 2 points for moving average
-                avg_total = sum(item['total_amount'] for item in window_data) / len(window_data)
-                avg_count = sum(item['transaction_count'] for item in window_data) / len(window_data)
-                
-                trends[i]['moving_avg_amount'] = round(avg_total, 2)
-                trends[i]['moving_avg_count'] = round(avg_count, 1)
+        totals = np.array([item['total_amount'] for item in trends], dtype=np.float64)
+        counts = np.array([item['transaction_count'] for item in trends], dtype=np.float64)
+        
+        # Window sums from prefix sums: sum(x[start:end]) == cs[end] - cs[start]
+        ends = np.arange(1, len(trends) + 1)
+        starts = np.maximum(0, ends - window)
+        lengths = ends - starts
+        total_cs = np.concatenate(([0.0], np.cumsum(totals)))
+        count_cs = np.concatenate(([0.0], np.cumsum(counts)))
+        avg_totals = self._round_array((total_cs[ends] - total_cs[starts]) / lengths, 2)
+        avg_counts = self._round_array((count_cs[ends] - count_cs[starts]) / lengths, 1)
+        
+        for i, length in enumerate(lengths.tolist()):
+            if length >= 2:  # Need at least 2 points for moving average
+                trends[i]['moving_avg_amount'] = avg_totals[i]
+                trends[i]['moving_avg_count'] = avg_counts[i]
             else:
                 trends[i]['moving_avg_amount'] = trends[i]['total_amount']
                 trends[i]['moving_avg_count'] = trends[i]['transaction_count']
     
-    def spending_by_day_of_week(self, receipts: List[Receipt]) -> List[Dict[str, Any]]:
+    def spending_by_day_of_week(self, receipts: ReceiptSource) -> List[Dict[str, Any]]:
         """
         Analyze spending patterns by day of the week
         Returns spending totals and averages for each day
         """
-        if not receipts:
-            return []
-        
         # Group by day of week (0=Monday, 6=Sunday)
-        daily_data = defaultdict(lambda: {'total': 0.0, 'count': 0})
-        
-        for receipt in receipts:
-            if receipt.transaction_date and receipt.amount:
-                day_of_week = receipt.transaction_date.weekday()
-                daily_data[day_of_week]['total'] += receipt.amount
-                daily_data[day_of_week]['count'] += 1
+        if isinstance(receipts, (Query, RunningAggregates)):
+            if isinstance(receipts, Query):
+                day_totals = self._sql_weekday_totals(receipts)
+                has_receipts = bool(day_totals) or receipts.with_entities(Receipt.id).order_by(None).first() is not None
+            else:
+                day_totals = receipts.weekday
+                has_receipts = receipts.receipt_count > 0
+            
+            # Undated receipts still get the seven zero rows; only an empty set returns none
+            if not has_receipts:
+                return []
+            
+            daily_data = defaultdict(lambda: {'total': 0.0, 'count': 0})
+            for day_of_week, (total, count) in day_totals.items():
+                daily_data[day_of_week] = {'total': total, 'count': count}
+        else:
+            if not receipts:
+                return []
+            
+            daily_data = self._group_by_weekday(self._time_arrays(self._as_columns(receipts)))
         
+        return self._format_daily_spending(daily_data)
+    
+    def _sql_weekday_totals(self, query: Query) -> Dict[int, Tuple[float, int]]:
+        """Return {weekday: (total, count)} grouped in the database (0=Monday)"""
+        # SQL 'dow' counts from Sunday=0; shift to Python's Monday=0
+        dow = extract('dow', Receipt.transaction_date)
+        rows = self._dated_amounts(query).with_entities(
+            dow, func.sum(Receipt.amount), func.count(Receipt.id)
+        ).group_by(dow).all()
+        
+        return {(int(day) + 6) % 7: (float(total), count) for day, total, count in rows}
+    
+    def _format_daily_spending(self, daily_data: Dict[int, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Build the seven day-of-week entries from per-day totals and counts"""
         # Convert to list with day names
         day_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+        days = [daily_data[day_num] for day_num in range(7)]
+        totals, averages = self._rounded_totals_and_averages(days)
         daily_spending = []
         
-        for day_num in range(7):
-            data = daily_data[day_num]
-            avg_amount = data['total'] / data['count'] if data['count'] > 0 else 0
-            
+        for day_num, data in enumerate(days):
             daily_spending.append({
                 'day_of_week': day_names[day_num],
                 'day_number': day_num,
-                'total_amount': round(data['total'], 2),
+                'total_amount': totals[day_num],
                 'transaction_count': data['count'],
-                'average_amount': round(avg_amount, 2)
+                'average_amount': averages[day_num]
             })
         
         return daily_spending
     
-    def amount_distribution_histogram(self, receipts: List[Receipt], bins: int = 10) -> List[Dict[str, Any]]:
+    def amount_distribution_histogram(self, receipts: ReceiptSource, bins: int = 10) -> List[Dict[str, Any]]:
         """
         Create histogram of amount distribution
         Returns binned data showing spending patterns
         """
-        if not receipts:
+        if isinstance(receipts, Query):
+            return self._sql_amount_histogram(receipts, bins)
+        elif not receipts:
             return []
         
-        amounts = [r.amount for r in receipts if r.amount is not None]
-        if not amounts:
+        columns = self._as_columns(receipts)
+        amounts = columns.amounts[~np.isnan(columns.amounts)]
+        if not amounts.size:
             return []
         
         # Calculate bin boundaries
-        min_amount = min(amounts)
-        max_amount = max(amounts)
+        edges, bin_width = self._histogram_edges(amounts.min(), amounts.max(), bins)
+        
+        # Locate each amount's bin with one binary search; the last bin includes max_amount
+        bin_indices = np.clip(np.searchsorted(edges, amounts, side='right') - 1, 0, bins - 1)
+        counts = np.bincount(bin_indices, minlength=bins)
+        
+        return self._build_histogram_rows(edges, bin_width, counts)
+    
+    def _histogram_edges(self, min_amount: float, max_amount: float, bins: int) -> Tuple[np.ndarray, float]:
+        """Equal-width bin edges spanning [min_amount, max_amount]"""
         bin_width = (max_amount - min_amount) / bins
+        return min_amount + np.arange(bins + 1) * bin_width, bin_width
+    
+    def _sql_amount_histogram(self, query: Query, bins: int) -> List[Dict[str, Any]]:
+        """
+        Histogram counted in the database: one MIN/MAX pass, then GROUP BY bin
+        Bins are assigned by comparing against the same edges as the in-memory path
+        """
+        amounts = query.filter(Receipt.amount.isnot(None))
+        min_amount, max_amount = amounts.with_entities(func.min(Receipt.amount), func.max(Receipt.amount)).one()
+        if min_amount is None:
+            return []
         
-        # Create bins
+        edges, bin_width = self._histogram_edges(float(min_amount), float(max_amount), bins)
+        counts = np.zeros(bins, dtype=np.int64)
+        
+        if bins == 1:
+            counts[0] = amounts.count()
+            return self._build_histogram_rows(edges, bin_width, counts)
+        
+        # amount < edges[i + 1] picks bin i, matching searchsorted(side='right'); the rest fall in the last bin
+        bin_index = case(
+            *[(Receipt.amount < float(edge), index) for index, edge in enumerate(edges[1:-1])],
+            else_=bins - 1
+        ).label('bin_index')
+        # Group over a subquery column so the bound CASE is not repeated in GROUP BY
+        binned = amounts.with_entities(bin_index).subquery()
+        rows = self.db.query(binned.c.bin_index, func.count()).group_by(binned.c.bin_index).all()
+        
+        for index, count in rows:
+            counts[int(index)] = count
+        
+        return self._build_histogram_rows(edges, bin_width, counts)
+    
+    def _build_histogram_rows(self, edges: np.ndarray, bin_width: float, counts: np.ndarray) -> List[Dict[str, Any]]:
+        """Format per-bin counts as histogram rows with centers and percentages"""
+        percentages = counts * (100.0 / counts.sum())
+        centers = edges[:-1] + bin_width / 2
+        
+        rounded_edges = self._round_array(edges)
         histogram = []
-        for i in range(bins):
-            bin_start = min_amount + (i * bin_width)
-            bin_end = bin_start + bin_width
-            
-            # Count amounts in this bin
-            count = sum(1 for amount in amounts if bin_start <= amount < bin_end)
-            
-            # Handle the last bin to include max_amount
-            if i == bins - 1:
-                count = sum(1 for amount in amounts if bin_start <= amount <= bin_end)
-            
-            percentage = (count / len(amounts)) * 100 if amounts else 0
-            
+        for bin_start, bin_end, bin_center, count, percentage in zip(
+            rounded_edges[:-1], rounded_edges[1:], self._round_array(centers),
+            counts.tolist(), self._round_array(percentages)
+        ):
             histogram.append({
-                'bin_start': round(bin_start, 2),
-                'bin_end': round(bin_end, 2),
-                'bin_center': round(bin_start + bin_width/2, 2),
+                'bin_start': bin_start,
+                'bin_end': bin_end,
+                'bin_center': bin_center,
                 'count': count,
-                'percentage': round(percentage, 2)
+                'percentage': percentage
             })
         
         return histogram
     
-    def quarterly_analysis(self, receipts: List[Receipt]) -> List[Dict[str, Any]]:
+    def quarterly_analysis(self, receipts: ReceiptSource) -> List[Dict[str, Any]]:
         """
         Analyze spending by quarters
         Returns quarterly aggregations with year-over-year comparisons
         """
-        if not receipts:
-            return []
-        
-        # Group by quarter
-        quarterly_data = defaultdict(lambda: {'total': 0.0, 'count': 0})
-        
-        for receipt in receipts:
-            if receipt.transaction_date and receipt.amount:
-                date = receipt.transaction_date
-                quarter = (date.month - 1) // 3 + 1
-                quarter_key = f"{date.year}-Q{quarter}"
-                
-                quarterly_data[quarter_key]['total'] += receipt.amount
-                quarterly_data[quarter_key]['count'] += 1
-        
+        if isinstance(receipts, (Query, RunningAggregates)):
+            if isinstance(receipts, Query):
+                monthly_totals = self._sql_monthly_totals(receipts)
+            else:
+                monthly_totals = sorted((year, month, total, count) for (year, month), (total, count) in receipts.monthly.items())
+            
+            # Roll the (at most 12 per year) monthly groups up into quarters
+            quarterly_data = defaultdict(lambda: {'total': 0.0, 'count': 0})
+            for year, month, total, count in monthly_totals:
+                quarter_key = f"{year}-Q{(month - 1) // 3 + 1}"
+                quarterly_data[quarter_key]['total'] += total
+                quarterly_data[quarter_key]['count'] += count
+        else:
+            quarterly_data = self._group_by_quarter(self._time_arrays(self._as_columns(receipts)))
+        
+        return self._format_quarterly_analysis(quarterly_data)
+    
+    def _format_quarterly_analysis(self, quarterly_data: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Build the quarterly list with year-over-year growth from per-quarter totals"""
         # Convert to sorted list
+        quarters = sorted(quarterly_data.items())
+        totals, averages = self._rounded_totals_and_averages([data for _, data in quarters])
+        
         quarterly_analysis = []
-        for quarter_key, data in sorted(quarterly_data.items()):
+        for (quarter_key, data), total, average in zip(quarters, totals, averages):
             year, quarter = quarter_key.split('-')
             
             quarterly_analysis.append({
                 'quarter': quarter_key,
                 'year': int(year),
                 'quarter_number': int(quarter[1]),
-                'total_amount': round(data['total'], 2),
+                'total_amount': total,
                 'transaction_count': data['count'],
-                'average_amount': round(data['total'] / data['count'], 2)
+                'average_amount': average
             })
         
         # Add year-over-year growth rates
@@ -375,18 +914,76 @@ class AggregationAlgorithms:
                 else:
                     current['yoy_growth_rate'] = None
     
-    def comprehensive_analysis(self, receipts: List[Receipt]) -> Dict[str, Any]:
+    def comprehensive_analysis(self, receipts: ReceiptSource) -> Dict[str, Any]:
         """
         Generate comprehensive analysis combining all aggregation functions
         Returns complete statistical overview
         """
+        if not isinstance(receipts, Query):
+            return self._comprehensive_analysis(receipts)
+        
+        # Memoize Query inputs on the query itself plus a cheap fingerprint of its rows
+        cache_key = self._analysis_cache_key(receipts)
+        cls = type(self)
+        with cls._analysis_cache_lock:
+            cached = cls._analysis_cache.get(cache_key)
+            if cached is not None:
+                cls._analysis_cache.move_to_end(cache_key)
+                return copy.deepcopy(cached)
+        
+        analysis = self._comprehensive_analysis(receipts)
+        
+        with cls._analysis_cache_lock:
+            cls._analysis_cache[cache_key] = analysis
+            cls._analysis_cache.move_to_end(cache_key)
+            while len(cls._analysis_cache) > ANALYSIS_CACHE_SIZE:
+                cls._analysis_cache.popitem(last=False)
+        
+        return copy.deepcopy(analysis)
+    
+    def _analysis_cache_key(self, query: Query) -> Tuple:
+        """
+        Build a cache key from the compiled query and one fingerprint round trip
+        Fingerprint: (count, max id, max upload date) of the matching receipts
+        """
+        compiled = query.statement.compile()
+        
+        return (
+            str(self.db.get_bind().url),
+            str(compiled),
+            tuple(sorted(compiled.params.items())),
+            self._fingerprint(query)
+        )
+    
+    def _comprehensive_analysis(self, receipts: ReceiptSource) -> Dict[str, Any]:
+        """Compute every aggregate for the comprehensive analysis"""
+        if isinstance(receipts, Query) or not receipts:
+            vendor_distribution = self.vendor_frequency_distribution(receipts)
+            category_distribution = self.category_frequency_distribution(receipts)
+            top_vendors = self.top_vendors_by_amount(receipts)
+            monthly_trends = self.monthly_spending_trends(receipts)
+            daily_patterns = self.spending_by_day_of_week(receipts)
+            quarterly_analysis = self.quarterly_analysis(receipts)
+        else:
+            # Extract every receipt column once and share the arrays across all aggregations
+            receipts = self._as_columns(receipts)
+            vendor_distribution = self.vendor_frequency_distribution(receipts)
+            category_distribution = self.category_frequency_distribution(receipts)
+            top_vendors = self.top_vendors_by_amount(receipts)
+            
+            # Filter dated amounts once and bucket them for every time series
+            time_arrays = self._time_arrays(receipts)
+            monthly_trends = self._format_monthly_trends(self._group_by_month(time_arrays))
+            daily_patterns = self._format_daily_spending(self._group_by_weekday(time_arrays))
+            quarterly_analysis = self._format_quarterly_analysis(self._group_by_quarter(time_arrays))
+        
         return {
             'basic_statistics': self.calculate_basic_stats(receipts),
-            'vendor_distribution': self.vendor_frequency_distribution(receipts),
-            'category_distribution': self.category_frequency_distribution(receipts),
-            'top_vendors': self.top_vendors_by_amount(receipts),
-            'monthly_trends': self.monthly_spending_trends(receipts),
-            'daily_patterns': self.spending_by_day_of_week(receipts),
+            'vendor_distribution': vendor_distribution,
+            'category_distribution': category_distribution,
+            'top_vendors': top_vendors,
+            'monthly_trends': monthly_trends,
+            'daily_patterns': daily_patterns,
             'amount_histogram': self.amount_distribution_histogram(receipts),
-            'quarterly_analysis': self.quarterly_analysis(receipts)
+            'quarterly_analysis': quarterly_analysis
         }
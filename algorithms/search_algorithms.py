@@ -1,9 +1,124 @@
 from typing import List, Dict, Any, Optional
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
-from models.database import Receipt
+from sqlalchemy import and_, or_, func, select, String
+from models.database import Receipt, receipt_tsv, receipts_fts, receipts_fts_match
 from datetime import datetime
+from rapidfuzz import process
+from rapidfuzz.distance import Levenshtein
+from functools import lru_cache
+from collections import defaultdict
 import re
+import threading
+import weakref
+
+# Rows fetched per round trip when streaming projected columns
+ROW_BATCH_SIZE = 10_000
+
+# Smaller batches for the index build since raw_text can be large
+INDEX_BATCH_SIZE = 1000
+
+# Maximum ids per IN (...) clause when loading matched receipts
+ID_CHUNK_SIZE = 900
+
+# Dialects that can evaluate case-insensitive regular expressions in SQL
+REGEX_DIALECTS = {'sqlite', 'postgresql'}
+
+# Default pg_trgm.similarity_threshold used by the % operator
+PG_TRGM_DEFAULT_THRESHOLD = 0.3
+
+# Shortest term the receipts_fts trigram index can match; shorter terms fall back to LIKE
+FTS_MIN_LENGTH = 3
+
+# Sortable search fields; text fields sort case-insensitively like SortAlgorithms
+SORT_COLUMNS = {
+    'amount': Receipt.amount,
+    'transaction_date': Receipt.transaction_date,
+    'upload_date': Receipt.upload_date,
+    'vendor': func.lower(Receipt.vendor),
+    'category': func.lower(Receipt.category)
+}
+
+# Words of three or more letters, compiled once for keyword extraction
+_WORD_RE = re.compile(r'\b[A-Za-z]{3,}\b')
+
+# Common stop words excluded from the keyword index
+_STOP_WORDS = frozenset({
+    'the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'can', 'had',
+    'her', 'was', 'one', 'our', 'out', 'day', 'get', 'has', 'him', 'his',
+    'how', 'its', 'may', 'new', 'now', 'old', 'see', 'two', 'who', 'boy',
+    'did', 'she', 'use', 'way', 'will', 'with'
+})
+
+def fts_match_ids(dialect: str, term: str, columns: Optional[List[str]] = None):
+    """
+    Select of receipt ids whose columns (default: vendor, raw text and category) contain term, case-insensitively
+    Answered by the SQLite receipts_fts trigram index; None where it cannot answer the same as ILIKE:
+    other dialects, terms shorter than a trigram, and LIKE wildcards
+    """
+    if dialect != 'sqlite' or len(term) < FTS_MIN_LENGTH or '%' in term or '_' in term:
+        return None
+    
+    # A quoted phrase matches the term as a literal substring
+    query = '"' + term.replace('"', '""') + '"'
+    if columns:
+        query = "{" + " ".join(columns) + "} : " + query
+    return select(receipts_fts.c.rowid).where(receipts_fts_match(query))
+
+def substring_condition(dialect: str, column, term: str):
+    """Case-insensitive substring filter on one receipt text column, like column ILIKE '%term%'"""
+    matched_ids = fts_match_ids(dialect, term, [column.key])
+    if matched_ids is not None:
+        return Receipt.id.in_(matched_ids)
+    return column.ilike(f"%{term}%")
+
+@lru_cache(maxsize=128)
+def _compile(pattern: str) -> "re.Pattern":
+    """Compile a case-insensitive search pattern, reusing recent compilations"""
+    return re.compile(pattern, re.IGNORECASE)
+
+class _SearchIndexes:
+    """Hash indexes shared by every SearchAlgorithms instance on one engine"""
+    
+    def __init__(self):
+        # Vendor hash index
+        self.vendor_index = defaultdict(set)
+        # Category hash index
+        self.category_index = defaultdict(set)
+        # Keyword hash index
+        self.keyword_index = defaultdict(set)
+        
+        # Index entries per receipt so updated or deleted rows can be removed
+        self.entries_by_id = {}
+        # Highest receipt id ingested so far
+        self.last_id = 0
+        self.lock = threading.Lock()
+    
+    def add(self, receipt_id: int, vendor: Optional[str], category: Optional[str], keywords: List[str]):
+        """Add one receipt to every index"""
+        entries = []
+        
+        if vendor:
+            entries.append((self.vendor_index, vendor.lower()))
+        if category:
+            entries.append((self.category_index, category.lower()))
+        for keyword in keywords:
+            entries.append((self.keyword_index, keyword))
+        
+        for index, key in entries:
+            index[key].add(receipt_id)
+        
+        self.entries_by_id[receipt_id] = entries
+        self.last_id = max(self.last_id, receipt_id)
+    
+    def remove(self, receipt_id: int):
+        """Remove one receipt from every index"""
+        for index, key in self.entries_by_id.pop(receipt_id, ()):
+            postings = index.get(key)
+            if postings is not None:
+                postings.discard(receipt_id)
+                if not postings:
+                    del index[key]
 
 class SearchAlgorithms:
     """
@@ -11,59 +126,68 @@ class SearchAlgorithms:
     Includes linear search, hash-based indexing, and pattern matching
     """
     
+    # Indexes outlive request-scoped instances; one set per database engine
+    _shared_indexes = weakref.WeakKeyDictionary()
+    _shared_indexes_lock = threading.Lock()
+    
     def __init__(self, db: Session):
         self.db = db
+        self.dialect = db.get_bind().dialect.name
+        
+        engine = db.get_bind()
+        with self._shared_indexes_lock:
+            if engine not in self._shared_indexes:
+                self._shared_indexes[engine] = _SearchIndexes()
+            self._indexes = self._shared_indexes[engine]
+        
+        self.vendor_index = self._indexes.vendor_index
+        self.category_index = self._indexes.category_index
+        self.keyword_index = self._indexes.keyword_index
         self._build_search_indexes()
     
     def _build_search_indexes(self):
-        """Build hash-based indexes for optimized search performance"""
-        # Vendor hash index
-        self.vendor_index = {}
-        # Category hash index  
-        self.category_index = {}
-        # Keyword hash index
-        self.keyword_index = {}
-        
-        # Build indexes from existing data
-        receipts = self.db.query(Receipt).all()
-        for receipt in receipts:
-            # Vendor index
-            if receipt.vendor:
-                vendor_key = receipt.vendor.lower()
-                if vendor_key not in self.vendor_index:
-                    self.vendor_index[vendor_key] = []
-                self.vendor_index[vendor_key].append(receipt.id)
-            
-            # Category index
-            if receipt.category:
-                category_key = receipt.category.lower()
-                if category_key not in self.category_index:
-                    self.category_index[category_key] = []
-                self.category_index[category_key].append(receipt.id)
-            
-            # Keyword index from raw text
-            if receipt.raw_text:
-                keywords = self._extract_keywords(receipt.raw_text)
-                for keyword in keywords:
-                    if keyword not in self.keyword_index:
-                        self.keyword_index[keyword] = []
-                    self.keyword_index[keyword].append(receipt.id)
+        """
+        Build hash-based indexes for optimized search performance
+        Only receipts added since the last build are ingested
+        """
+        with self._indexes.lock:
+            self._ingest(Receipt.id > self._indexes.last_id)
+    
+    def _ingest(self, condition):
+        """Stream matching receipts into the shared indexes (caller holds the lock)"""
+        # Stream only the indexed columns in batches so the table never sits in memory
+        rows = self.db.query(
+            Receipt.id, Receipt.vendor, Receipt.category, Receipt.raw_text
+        ).filter(condition).execution_options(stream_results=True).yield_per(INDEX_BATCH_SIZE)
+        
+        for receipt_id, vendor, category, raw_text in rows:
+            self._indexes.add(receipt_id, vendor, category, self._extract_keywords(raw_text))
     
     def linear_search(self, field: str, value: Any) -> List[Receipt]:
         """
         Linear search implementation - O(n) time complexity
         Useful for exact matches and when dataset is small
         """
-        receipts = self.db.query(Receipt).all()
-        results = []
+        column = self._searchable_column(field)
+        if column is None:
+            return []
+        
+        value_lower = str(value).lower()
         
-        for receipt in receipts:
-            if hasattr(receipt, field):
-                receipt_value = getattr(receipt, field)
-                if receipt_value and str(receipt_value).lower() == str(value).lower():
-                    results.append(receipt)
+        # Text columns are compared case-insensitively inside the database
+        if self._is_text_column(column):
+            return self.db.query(Receipt).filter(
+                column != '',
+                func.lower(column) == value_lower
+            ).order_by(Receipt.id).all()
         
-        return results
+        # Scan only (id, field) pairs and load full receipts for the matches
+        matched_ids = [
+            receipt_id for receipt_id, receipt_value in self._scan_column(column)
+            if receipt_value and str(receipt_value).lower() == value_lower
+        ]
+        
+        return self._load_receipts(matched_ids)
     
     def hash_search(self, field: str, value: str) -> List[Receipt]:
         """
@@ -71,44 +195,54 @@ class SearchAlgorithms:
         Optimized for frequent searches on indexed fields
         """
         value_key = value.lower()
-        receipt_ids = []
+        indexes = {
+            'vendor': self.vendor_index,
+            'category': self.category_index,
+            'keyword': self.keyword_index
+        }
         
-        if field == 'vendor' and value_key in self.vendor_index:
-            receipt_ids = self.vendor_index[value_key]
-        elif field == 'category' and value_key in self.category_index:
-            receipt_ids = self.category_index[value_key]
-        elif field == 'keyword' and value_key in self.keyword_index:
-            receipt_ids = self.keyword_index[value_key]
+        # Copy the posting set so concurrent refreshes cannot mutate it mid-query
+        with self._indexes.lock:
+            receipt_ids = list(indexes.get(field, {}).get(value_key, ()))
         
         if receipt_ids:
             return self.db.query(Receipt).filter(Receipt.id.in_(receipt_ids)).all()
         
         return []
     
-    def keyword_search(self, keyword: str) -> List[Receipt]:
+    def keyword_search(self, keyword: str, exact_only: bool = False) -> List[Receipt]:
         """
         Keyword search in vendor names and raw text
         Uses both hash index and SQL LIKE for comprehensive results
+        With exact_only, a hash index hit skips the substring scan entirely
         """
         keyword_lower = keyword.lower()
         
         # First try hash index for exact keyword matches
         hash_results = self.hash_search('keyword', keyword_lower)
-        
-        # Then use SQL LIKE for partial matches
-        sql_results = self.db.query(Receipt).filter(
-            or_(
-                Receipt.vendor.ilike(f'%{keyword}%'),
-                Receipt.raw_text.ilike(f'%{keyword}%'),
-                Receipt.category.ilike(f'%{keyword}%')
+        if exact_only and hash_results:
+            return hash_results
+        
+        # Then find partial matches, fetching ids only: best BM25 rank first from the SQLite FTS index, else SQL LIKE
+        fts_ids = fts_match_ids(self.dialect, keyword)
+        if fts_ids is not None:
+            matched_ids = self.db.execute(fts_ids.order_by(receipts_fts.c.rank))
+        else:
+            matched_ids = self.db.query(Receipt.id).filter(
+                or_(
+                    Receipt.vendor.ilike(f'%{keyword}%'),
+                    Receipt.raw_text.ilike(f'%{keyword}%'),
+                    Receipt.category.ilike(f'%{keyword}%')
+                )
             )
-        ).all()
         
-        # Combine and deduplicate results
-        all_results = hash_results + sql_results
-        unique_results = list({receipt.id: receipt for receipt in all_results}.values())
+        # Only hydrate receipts the hash index did not already return
+        hash_ids = {receipt.id for receipt in hash_results}
+        sql_results = self._load_receipts([
+            receipt_id for (receipt_id,) in matched_ids if receipt_id not in hash_ids
+        ])
         
-        return unique_results
+        return hash_results + sql_results
     
     def range_search(self, field: str, min_value: Any, max_value: Any) -> List[Receipt]:
         """
@@ -137,23 +271,29 @@ class SearchAlgorithms:
         Pattern-based search using regular expressions
         Useful for complex text matching requirements
         """
-        receipts = self.db.query(Receipt).all()
-        results = []
-        
         try:
-            regex_pattern = re.compile(pattern, re.IGNORECASE)
-            
-            for receipt in receipts:
-                if hasattr(receipt, field):
-                    field_value = getattr(receipt, field)
-                    if field_value and regex_pattern.search(str(field_value)):
-                        results.append(receipt)
-        
+            regex_pattern = _compile(pattern)
         except re.error:
             # Invalid regex pattern, fall back to simple string matching
             return self.keyword_search(pattern)
         
-        return results
+        column = self._searchable_column(field)
+        if column is None:
+            return []
+        
+        # Push the regex into the database when the dialect supports it
+        if self._is_text_column(column) and self.dialect in REGEX_DIALECTS:
+            return self.db.query(Receipt).filter(
+                column != '',
+                self._regex_condition(column, pattern)
+            ).order_by(Receipt.id).all()
+        
+        matched_ids = [
+            receipt_id for receipt_id, field_value in self._scan_column(column)
+            if field_value and regex_pattern.search(str(field_value))
+        ]
+        
+        return self._load_receipts(matched_ids)
     
     def multi_criteria_search(self, filters: Dict[str, Any]) -> List[Receipt]:
         """
@@ -161,15 +301,44 @@ class SearchAlgorithms:
         Combines different search algorithms for optimal performance
         """
         query = self.db.query(Receipt)
+        conditions = self._build_filter_clause(filters)
+        
+        # Apply all conditions
+        if conditions:
+            query = query.filter(and_(*conditions))
+        
+        return query.all()
+    
+    def search_page(self, filters: Dict[str, Any], sort_field: Optional[str] = None,
+                    descending: bool = False, skip: int = 0, limit: int = 100) -> List[Row]:
+        """
+        One page of multi-criteria search results, filtered, sorted and paginated in a single query
+        The database only has to produce skip + limit rows (an index can serve ORDER BY ... LIMIT)
+        Missing values sort first ascending and last descending, ties in id order
+        Results are read-only rows of every receipt column rather than ORM objects
+        """
+        stmt = select(*Receipt.__table__.c).where(*self._build_filter_clause(filters))
+        
+        sort_column = SORT_COLUMNS.get(sort_field)
+        if sort_column is not None:
+            order = sort_column.desc().nulls_last() if descending else sort_column.asc().nulls_first()
+            stmt = stmt.order_by(order, Receipt.id)
+        else:
+            stmt = stmt.order_by(Receipt.id)
+        
+        return self.db.execute(stmt.offset(skip).limit(limit)).all()
+    
+    def _build_filter_clause(self, filters: Dict[str, Any]) -> List[Any]:
+        """SQL conditions for the multi-criteria search filters (all must match)"""
         conditions = []
         
         # Vendor filter
         if filters.get('vendor'):
-            conditions.append(Receipt.vendor.ilike(f"%{filters['vendor']}%"))
+            conditions.append(substring_condition(self.dialect, Receipt.vendor, filters['vendor']))
         
         # Category filter
         if filters.get('category'):
-            conditions.append(Receipt.category.ilike(f"%{filters['category']}%"))
+            conditions.append(substring_condition(self.dialect, Receipt.category, filters['category']))
         
         # Amount range filter
         if filters.get('min_amount') is not None:
@@ -184,39 +353,106 @@ class SearchAlgorithms:
             conditions.append(Receipt.transaction_date <= filters['end_date'])
         
         # Keyword search in text
-        if filters.get('keyword'):
+        if filters.get('keyword') and self.dialect == 'postgresql':
+            # Full-text match on the GIN-indexed tsv column; vendor and category substrings use the trigram index
             keyword_condition = or_(
+                receipt_tsv.op('@@')(func.websearch_to_tsquery('english', filters['keyword'])),
                 Receipt.vendor.ilike(f"%{filters['keyword']}%"),
-                Receipt.raw_text.ilike(f"%{filters['keyword']}%"),
                 Receipt.category.ilike(f"%{filters['keyword']}%")
             )
             conditions.append(keyword_condition)
+        elif filters.get('keyword'):
+            # Substring match on the SQLite trigram FTS index where it applies, instead of LIKE over three columns
+            fts_ids = fts_match_ids(self.dialect, filters['keyword'])
+            if fts_ids is not None:
+                keyword_condition = Receipt.id.in_(fts_ids)
+            else:
+                keyword_condition = or_(
+                    Receipt.vendor.ilike(f"%{filters['keyword']}%"),
+                    Receipt.raw_text.ilike(f"%{filters['keyword']}%"),
+                    Receipt.category.ilike(f"%{filters['keyword']}%")
+                )
+            conditions.append(keyword_condition)
         
-        # Apply all conditions
-        if conditions:
-            query = query.filter(and_(*conditions))
-        
-        return query.all()
+        return conditions
     
     def fuzzy_search(self, field: str, value: str, threshold: float = 0.8) -> List[Receipt]:
         """
         Fuzzy string matching for approximate searches
         Uses Levenshtein distance for similarity scoring
         """
-        receipts = self.db.query(Receipt).all()
-        results = []
+        column = self._searchable_column(field)
+        if column is None:
+            return []
         
-        for receipt in receipts:
-            if hasattr(receipt, field):
-                field_value = getattr(receipt, field)
-                if field_value:
-                    similarity = self._calculate_similarity(str(field_value).lower(), value.lower())
-                    if similarity >= threshold:
-                        results.append((receipt, similarity))
+        # PostgreSQL ranks candidates with pg_trgm trigram similarity
+        if self._is_text_column(column) and self.dialect == 'postgresql':
+            return self._trigram_search(column, value, threshold)
+        
+        # Candidate values keyed by receipt id
+        choices = {
+            receipt_id: str(field_value).lower()
+            for receipt_id, field_value in self._scan_column(column)
+            if field_value
+        }
+        # Score every candidate in C with bit-parallel Levenshtein
+        results = [
+            (receipt_id, similarity)
+            for _, similarity, receipt_id in process.extract_iter(
+                value.lower(), choices,
+                scorer=Levenshtein.normalized_similarity,
+                score_cutoff=threshold
+            )
+        ]
         
         # Sort by similarity score (descending)
         results.sort(key=lambda x: x[1], reverse=True)
-        return [receipt for receipt, _ in results]
+        return self._load_receipts([receipt_id for receipt_id, _ in results])
+    
+    def _searchable_column(self, field: str):
+        """Return the Receipt column for a field name, or None if it is not a column"""
+        if field not in Receipt.__table__.columns:
+            return None
+        return getattr(Receipt, field)
+    
+    def _is_text_column(self, column) -> bool:
+        """Check whether a column stores strings"""
+        return isinstance(column.type, String)
+    
+    def _regex_condition(self, column, pattern: str):
+        """Case-insensitive regex match rendered for the current dialect"""
+        if self.dialect == 'postgresql':
+            # Renders as column ~* pattern
+            return column.regexp_match(pattern, flags='i')
+        
+        # SQLite evaluates REGEXP with Python's re module; flags go inline
+        return column.regexp_match(f'(?i){pattern}')
+    
+    def _trigram_search(self, column, value: str, threshold: float) -> List[Receipt]:
+        """Fuzzy search with pg_trgm similarity, best matches first"""
+        similarity = func.similarity(column, value)
+        query = self.db.query(Receipt.id).filter(similarity >= threshold)
+        
+        if threshold >= PG_TRGM_DEFAULT_THRESHOLD:
+            # The % operator lets the trigram GIN index prefilter candidates
+            query = query.filter(column.op('%')(value))
+        
+        matched_ids = [receipt_id for (receipt_id,) in query.order_by(similarity.desc(), Receipt.id)]
+        return self._load_receipts(matched_ids)
+    
+    def _scan_column(self, column):
+        """Stream (id, value) pairs for one column in table order"""
+        return self.db.query(Receipt.id, column).order_by(Receipt.id).yield_per(ROW_BATCH_SIZE)
+    
+    def _load_receipts(self, receipt_ids: List[int]) -> List[Receipt]:
+        """Load full receipts for matched ids, preserving the given order"""
+        receipts_by_id = {}
+        for start in range(0, len(receipt_ids), ID_CHUNK_SIZE):
+            chunk = receipt_ids[start:start + ID_CHUNK_SIZE]
+            for receipt in self.db.query(Receipt).filter(Receipt.id.in_(chunk)):
+                receipts_by_id[receipt.id] = receipt
+        
+        return [receipts_by_id[receipt_id] for receipt_id in receipt_ids if receipt_id in receipts_by_id]
     
     def _calculate_similarity(self, str1: str, str2: str) -> float:
         """
@@ -226,38 +462,8 @@ class SearchAlgorithms:
         if not str1 or not str2:
             return 0.0
         
-        # Simple implementation of Levenshtein distance
-        len1, len2 = len(str1), len(str2)
-        if len1 == 0:
-            return 0.0 if len2 > 0 else 1.0
-        if len2 == 0:
-            return 0.0
-        
-        # Create distance matrix
-        matrix = [[0] * (len2 + 1) for _ in range(len1 + 1)]
-        
-        # Initialize first row and column
-        for i in range(len1 + 1):
-            matrix[i][0] = i
-        for j in range(len2 + 1):
-            matrix[0][j] = j
-        
-        # Fill the matrix
-        for i in range(1, len1 + 1):
-            for j in range(1, len2 + 1):
-                cost = 0 if str1[i-1] == str2[j-1] else 1
-                matrix[i][j] = min(
-                    matrix[i-1][j] + 1,      # deletion
-                    matrix[i][j-1] + 1,      # insertion
-                    matrix[i-1][j-1] + cost  # substitution
-                )
-        
-        # Calculate similarity score
-        max_len = max(len1, len2)
-        distance = matrix[len1][len2]
-        similarity = 1.0 - (distance / max_len)
-        
-        return similarity
+        # Normalized by the longer string: 1 - distance / max(len1, len2)
+        return Levenshtein.normalized_similarity(str1, str2)
     
     def _extract_keywords(self, text: str) -> List[str]:
         """Extract keywords from text for indexing"""
@@ -265,19 +471,20 @@ class SearchAlgorithms:
             return []
         
         # Remove special characters and split into words
-        words = re.findall(r'\b[A-Za-z]{3,}\b', text.lower())
-        
-        # Filter out common stop words
-        stop_words = {
-            'the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'can', 'had',
-            'her', 'was', 'one', 'our', 'out', 'day', 'get', 'has', 'him', 'his',
-            'how', 'its', 'may', 'new', 'now', 'old', 'see', 'two', 'who', 'boy',
-            'did', 'she', 'use', 'way', 'will', 'with'
-        }
+        words = _WORD_RE.findall(text.lower())
         
-        keywords = [word for word in words if word not in stop_words and len(word) >= 3]
-        return list(set(keywords))
+        # Filter out common stop words (the regex already enforces length >= 3)
+        return list(set(words) - _STOP_WORDS)
     
-    def refresh_indexes(self):
-        """Refresh hash indexes when new data is added"""
+    def refresh_indexes(self, receipt_ids: Optional[List[int]] = None):
+        """
+        Refresh hash indexes when data changes
+        Re-indexes the given (updated, deleted or inserted) receipts, then any new rows
+        """
+        if receipt_ids:
+            with self._indexes.lock:
+                for receipt_id in receipt_ids:
+                    self._indexes.remove(receipt_id)
+                self._ingest(Receipt.id.in_(list(receipt_ids)))
+        
         self._build_search_indexes()
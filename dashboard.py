@@ -1,10 +1,16 @@
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
+from diskcache import Cache
+import threading
+import time
 import json
+import io
+import uuid
 
 # Configure Streamlit page
 st.set_page_config(
@@ -16,9 +22,22 @@ st.set_page_config(
 
 # API Configuration
 API_BASE_URL = "http://localhost:8000"
+API_CACHE_TTL = 60  # Seconds a cached API response is reused across reruns
+HEALTH_CHECK_TTL = 10  # Seconds an API health check result is reused within a session
+HEALTH_CHECK_TIMEOUT = 1  # Seconds to wait for the health check before reporting the API down
+DISK_CACHE_DIR = "/tmp/dashboard_cache"  # Persisted API responses; survives Streamlit restarts
+WEBGL_POINT_THRESHOLD = 1000  # Line charts with more points render with WebGL instead of SVG
+HISTOGRAM_BAR_LIMIT = 500  # Histograms with more bins draw one WebGL step outline instead of SVG bars
+
+# Narrow dtypes for chart columns; Plotly sends these as compact typed arrays
+CHART_DTYPES = {'total_amount': 'float32', 'moving_avg_amount': 'float32', 'bin_center': 'float32', 'count': 'int32'}
+UPLOAD_CHUNK_SIZE = 64 * 1024  # Bytes sent per chunk when streaming uploads
+UPLOAD_POLL_INTERVAL = 1  # Seconds between upload job status checks
+LABEL_COLUMNS = ['vendor', 'category', 'processing_status']  # Low-cardinality text stored as categoricals
+EXPORT_MIME_TYPES = {'csv': 'text/csv', 'json': 'application/json', 'parquet': 'application/octet-stream'}
 
 # Custom CSS for better styling
-st.markdown("""
+CSS_BLOCK = """
 <style>
     .main-header {
         font-size: 2.5rem;
@@ -41,71 +60,322 @@ st.markdown("""
         margin: 1rem 0;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Static page banners, built once at import
+HEADER_HTML = '<h1 class="main-header"> Receipt Processing Dashboard</h1>'
+UPLOAD_BANNER_HTML = """
+<div class="upload-section">
+    <h3>Upload your receipt or bill</h3>
+    <p>Supported formats: JPG, PNG, PDF, TXT</p>
+</div>
+"""
+CORRECTION_BANNER_HTML = """
+<div class="upload-section">
+    <h3> Correct Receipt Data</h3>
+    <p>Select a receipt and manually correct any parsing errors</p>
+</div>
+"""
+EXPORT_BANNER_HTML = """
+<div class="upload-section">
+    <h3> Export Your Data</h3>
+    <p>Export receipt data as CSV or JSON with optional filtering</p>
+</div>
+"""
+
+# Re-emitted every rerun: Streamlit drops elements a rerun does not render, so a one-shot guard would lose the styles
+st.markdown(CSS_BLOCK, unsafe_allow_html=True)
+
+@st.cache_resource
+def get_session():
+    """
+    Shared HTTP session, created once per server process rather than per rerun
+    Keeps connections to the API alive; idempotent requests retry twice on connection errors
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=Retry(total=2, backoff_factor=0.1))
+    session.mount("http://", adapter)
+    return session
 
 def check_api_connection():
-    """Check if the API is running"""
-    try:
-        response = requests.get(f"{API_BASE_URL}/health")
-        return response.status_code == 200
-    except:
-        return False
+    """
+    Check if the API is running
+    A healthy result is reused for HEALTH_CHECK_TTL seconds per session, so most reruns skip the request
+    """
+    stale = time.time() - st.session_state.get('health_checked_at', 0) > HEALTH_CHECK_TTL
+    if stale or not st.session_state.get('health_ok'):
+        try:
+            # HEAD: only the status line is needed, not the body
+            response = get_session().head(f"{API_BASE_URL}/health", timeout=HEALTH_CHECK_TIMEOUT)
+            st.session_state.health_ok = response.status_code == 200
+        except:
+            st.session_state.health_ok = False
+        st.session_state.health_checked_at = time.time()
+    
+    return st.session_state.health_ok
+
+def multipart_stream(field, file, boundary):
+    """
+    Yield a multipart/form-data body for one file in fixed-size chunks
+    requests sends a generator body with chunked transfer encoding instead of buffering it
+    """
+    filename = file.name.replace('"', '%22')
+    yield (
+        f'--{boundary}\r\n'
+        f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+        f'Content-Type: {file.type or "application/octet-stream"}\r\n\r\n'
+    ).encode('utf-8')
+    
+    file.seek(0)
+    while True:
+        chunk = file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        yield chunk
+    
+    yield f'\r\n--{boundary}--\r\n'.encode('utf-8')
 
 def upload_file(file):
-    """Upload file to API"""
+    """Upload file to API as a background job; returns the queued job or None"""
     try:
-        files = {"file": (file.name, file, file.type)}
-        response = requests.post(f"{API_BASE_URL}/receipts/upload", files=files)
-        return response.json() if response.status_code == 200 else None
+        boundary = uuid.uuid4().hex
+        response = get_session().post(
+            f"{API_BASE_URL}/receipts/upload/jobs",
+            data=multipart_stream("file", file, boundary),
+            headers={"Content-Type": f"multipart/form-data; boundary={boundary}"}
+        )
+        if response.status_code not in (200, 202):
+            return None
+        return response.json()
     except Exception as e:
         st.error(f"Upload failed: {str(e)}")
         return None
 
+def get_upload_job(job_id):
+    """Get the current status of an upload job (never cached)"""
+    try:
+        response = get_session().get(f"{API_BASE_URL}/receipts/job/{job_id}")
+        return response.json() if response.status_code == 200 else None
+    except:
+        return None
+
+@st.cache_data(ttl=API_CACHE_TTL, show_spinner=False)
+def fetch_json(path):
+    """
+    GET an API path and return its JSON, memoized across reruns
+    Failures raise, and Streamlit does not cache exceptions
+    """
+    response = get_session().get(f"{API_BASE_URL}{path}")
+    response.raise_for_status()
+    return response.json()
+
+@st.cache_data(ttl=API_CACHE_TTL, show_spinner=False)
+def post_search(payload_key):
+    """POST a search, memoized on its serialized {"filters", "sort"} payload"""
+    response = get_session().post(f"{API_BASE_URL}/receipts/search", json=json.loads(payload_key))
+    response.raise_for_status()
+    return response.json()
+
+def get_json_or_none(session, path):
+    """GET an API path without touching Streamlit state (safe in worker threads)"""
+    try:
+        response = session.get(f"{API_BASE_URL}{path}")
+        return response.json() if response.status_code == 200 else None
+    except:
+        return None
+
+@st.cache_resource
+def get_disk_cache():
+    """On-disk response cache shared by every session and kept across restarts"""
+    return Cache(DISK_CACHE_DIR)
+
+def refresh_disk_entry(disk, key, loader):
+    """Reload one disk cache entry; a failed load keeps the previous payload"""
+    payload = loader()
+    if payload is not None:
+        disk.set(key, (time.time(), payload))
+    return payload
+
+def read_through_disk(key, loader):
+    """
+    Return a payload from the disk cache, reloading it in the background once older than the TTL
+    Only a cold cache waits on the API; loader runs off the script thread, so it must not touch Streamlit state
+    """
+    disk = get_disk_cache()
+    entry = disk.get(key)
+    if entry is None:
+        payload = refresh_disk_entry(disk, key, loader)
+        if payload is None:
+            raise RuntimeError(f"{key} unavailable")
+        return payload
+    
+    stored_at, payload = entry
+    if time.time() - stored_at > API_CACHE_TTL:
+        # Stale-while-revalidate: serve the stored payload now, refresh it for the next render
+        threading.Thread(target=refresh_disk_entry, args=(disk, key, loader), daemon=True).start()
+    return payload
+
+@st.cache_data(ttl=API_CACHE_TTL, show_spinner=False)
+def fetch_receipt_list():
+    """The full receipt list, persisted on disk between restarts"""
+    session = get_session()
+    url = f"{API_BASE_URL}/receipts/"
+    return read_through_disk(url, lambda: get_json_or_none(session, "/receipts/"))
+
+@st.cache_data(ttl=API_CACHE_TTL, show_spinner=False)
+def fetch_analytics():
+    """
+    The analytics summary, persisted on disk between restarts
+    It already carries every section the analytics page shows, so no per-section endpoint is fetched
+    """
+    session = get_session()
+    url = f"{API_BASE_URL}/receipts/analytics/summary"
+    return read_through_disk(url, lambda: get_json_or_none(session, "/receipts/analytics/summary"))
+
+@st.cache_data(ttl=API_CACHE_TTL, show_spinner=False)
+def receipt_filter_options(receipt_count, max_id):
+    """
+    Distinct vendors and categories of the cached receipt list
+    Keyed by (count, max id) so reruns skip the scan until the list changes; expires with the other API caches
+    """
+    df = receipts_frame()
+    vendors = list(df[df['vendor'].notna()]['vendor'].unique())
+    categories = list(df[df['category'].notna()]['category'].unique())
+    return vendors, categories
+
+@st.cache_data(ttl=API_CACHE_TTL, show_spinner=False)
+def receipt_metrics(receipt_count, max_id):
+    """
+    Processed count, total and average amount of the cached receipt list
+    Computed in one aggregation pass and keyed like receipt_filter_options
+    """
+    df = receipts_frame()
+    amounts = df['amount']
+    processed_count = int((df['processing_status'] == 'processed').sum())
+    # sum/mean skip missing amounts, so no masked copy of the frame is needed
+    return processed_count, float(amounts.sum()), amounts.mean()
+
+def display_frame(rows):
+    """
+    Read-only DataFrame of receipt rows for filtering and display
+    Label columns become categoricals (filters compare integer codes, cached copies pickle smaller)
+    and dates are formatted once
+    """
+    df = pd.DataFrame(rows)
+    df = df.astype({column: 'category' for column in LABEL_COLUMNS if column in df.columns})
+    if 'transaction_date' in df.columns:
+        df['transaction_date_str'] = pd.to_datetime(df['transaction_date']).dt.strftime('%Y-%m-%d')
+    return df
+
+@st.cache_data(ttl=API_CACHE_TTL, show_spinner=False)
+def receipts_frame():
+    """The receipt list as a DataFrame, built once and reused across reruns"""
+    return display_frame(get_receipts())
+
+@st.cache_data(ttl=API_CACHE_TTL, show_spinner=False)
+def search_results_frame(payload_key):
+    """Search results as a DataFrame with formatted dates, memoized per filter and sort"""
+    return display_frame(post_search(payload_key))
+
+def search_key(filters, sort=None):
+    """Serialize a search request into a stable cache key (same filters and sort, same key)"""
+    return json.dumps({"filters": filters, "sort": sort}, sort_keys=True)
+
+def format_amounts(amounts):
+    """Format an amount column as $x.xx labels, 'N/A' where missing"""
+    # Bound str.format skips missing values, avoiding a per-row lambda and notna check
+    return amounts.map('${:.2f}'.format, na_action='ignore').fillna('N/A')
+
+def chart_frame(rows):
+    """DataFrame of pre-aggregated API rows with chart columns downcast"""
+    df = pd.DataFrame(rows)
+    return df.astype({column: dtype for column, dtype in CHART_DTYPES.items() if column in df.columns})
+
+def clear_api_cache():
+    """Drop cached API responses after a write or on user request"""
+    fetch_json.clear()
+    post_search.clear()
+    fetch_analytics.clear()
+    fetch_receipt_list.clear()
+    get_disk_cache().clear()
+    receipt_filter_options.clear()
+    receipt_metrics.clear()
+    receipts_frame.clear()
+    search_results_frame.clear()
+
+def refresh_button(key):
+    """Render a button that re-fetches this page's data from the API"""
+    if st.button(" Refresh", key=key):
+        clear_api_cache()
+
 def get_receipts():
     """Get all receipts from API"""
     try:
-        response = requests.get(f"{API_BASE_URL}/receipts/")
-        return response.json() if response.status_code == 200 else []
+        return fetch_receipt_list()
     except:
         return []
 
 def get_analytics():
     """Get analytics summary from API"""
     try:
-        response = requests.get(f"{API_BASE_URL}/receipts/analytics/summary")
-        return response.json() if response.status_code == 200 else None
+        return fetch_analytics()
     except:
         return None
 
-def search_receipts(filters):
-    """Search receipts with filters"""
+def get_receipt_index():
+    """Get id, filename and vendor of every receipt"""
     try:
-        response = requests.post(f"{API_BASE_URL}/receipts/search", json=filters)
-        return response.json() if response.status_code == 200 else []
+        return fetch_json("/receipts/ids?fields=id,filename,vendor")
     except:
         return []
 
+def get_receipt(receipt_id):
+    """Get one receipt with all fields from API"""
+    try:
+        return fetch_json(f"/receipts/{receipt_id}")
+    except:
+        return None
+
+def search_receipts(filters, sort=None):
+    """
+    Search receipts with filters and optional sort options, as a display DataFrame
+    Filters and sort form one cached request; failures raise for the caller to report
+    """
+    return search_results_frame(search_key(filters, sort))
+
 def apply_manual_correction(receipt_id, correction_data):
     """Apply manual corrections to a receipt"""
     try:
-        response = requests.post(f"{API_BASE_URL}/receipts/{receipt_id}/correct", json=correction_data)
-        return response.json() if response.status_code == 200 else None
+        response = get_session().post(f"{API_BASE_URL}/receipts/{receipt_id}/correct", json=correction_data)
+        if response.status_code != 200:
+            return None
+        clear_api_cache()
+        return response.json()
     except Exception as e:
         st.error(f"Correction failed: {str(e)}")
         return None
 
 def export_receipts(export_format, filters=None, fields=None):
-    """Export receipts as CSV or JSON"""
+    """
+    Export receipts as CSV, JSON or Parquet
+    The body is streamed in chunks into one buffer rather than joined by response.content
+    """
     try:
         export_data = {
             "format": export_format,
             "filters": filters,
             "include_fields": fields
         }
-        response = requests.post(f"{API_BASE_URL}/receipts/export", json=export_data)
-        if response.status_code == 200:
-            return response.content
-        return None
+        with get_session().post(f"{API_BASE_URL}/receipts/export", json=export_data, stream=True) as response:
+            if response.status_code != 200:
+                return None
+            
+            buffer = io.BytesIO()
+            for chunk in response.iter_content(chunk_size=UPLOAD_CHUNK_SIZE):
+                buffer.write(chunk)
+        
+        buffer.seek(0)
+        return buffer
     except Exception as e:
         st.error(f"Export failed: {str(e)}")
         return None
@@ -114,7 +384,7 @@ def main():
     """Main dashboard application"""
     
     # Header
-    st.markdown('<h1 class="main-header"> Receipt Processing Dashboard</h1>', unsafe_allow_html=True)
+    st.markdown(HEADER_HTML, unsafe_allow_html=True)
     
     # Check API connection
     if not check_api_connection():
@@ -146,12 +416,7 @@ def upload_page():
     """File upload page"""
     st.header("Upload Receipt")
     
-    st.markdown("""
-    <div class="upload-section">
-        <h3>Upload your receipt or bill</h3>
-        <p>Supported formats: JPG, PNG, PDF, TXT</p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(UPLOAD_BANNER_HTML, unsafe_allow_html=True)
     
     uploaded_file = st.file_uploader(
         "Choose a file",
@@ -169,86 +434,109 @@ def upload_page():
         with col3:
             st.info(f"**Type:** {uploaded_file.type}")
         
-        # Upload button
+        # Upload button; OCR runs as a server-side job that later reruns poll
         if st.button(" Process Receipt", type="primary"):
-            with st.spinner("Processing receipt..."):
-                result = upload_file(uploaded_file)
-                
-                if result:
-                    st.success(" Receipt processed successfully!")
-                    
-                    # Display extracted data
-                    st.subheader("Extracted Information")
-                    
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.metric("Vendor", result.get('vendor', 'Not detected'))
-                        st.metric("Amount", f"${result.get('amount', 0):.2f}" if result.get('amount') else "Not detected")
-                    
-                    with col2:
-                        st.metric("Category", result.get('category', 'Not categorized'))
-                        if result.get('transaction_date'):
-                            date_str = result['transaction_date'][:10]  # Extract date part
-                            st.metric("Date", date_str)
-                        else:
-                            st.metric("Date", "Not detected")
-                    
-                    # Confidence score
-                    if result.get('confidence_score'):
-                        confidence = result['confidence_score'] * 100
-                        st.progress(confidence / 100)
-                        st.caption(f"OCR Confidence: {confidence:.1f}%")
-                    
-                    # Raw text (expandable)
-                    if result.get('raw_text'):
-                        with st.expander("View Raw Extracted Text"):
-                            st.text(result['raw_text'])
-                
-                else:
-                    st.error(" Failed to process receipt. Please try again.")
+            job = upload_file(uploaded_file)
+            
+            if job:
+                st.session_state.upload_job_id = job['job_id']
+            else:
+                st.error(" Failed to process receipt. Please try again.")
+    
+    if st.session_state.get('upload_job_id'):
+        poll_upload_job(st.session_state.upload_job_id)
+
+def poll_upload_job(job_id):
+    """Show the state of a background upload, rerunning until it finishes"""
+    job = get_upload_job(job_id)
+    
+    if job and job['status'] in ('queued', 'processing'):
+        st.info(f" Processing receipt... ({job['status']})")
+        time.sleep(UPLOAD_POLL_INTERVAL)
+        st.rerun()
+    
+    del st.session_state.upload_job_id
+    
+    if job and job['status'] == 'done':
+        clear_api_cache()
+        result = get_receipt(job['receipt_id'])
+        if result:
+            st.success(" Receipt processed successfully!")
+            show_extracted_information(result)
+            return
+    
+    error = job.get('error') if job else None
+    st.error(f" Failed to process receipt: {error}" if error else " Failed to process receipt. Please try again.")
+
+def show_extracted_information(result):
+    """Display the fields extracted from a processed receipt"""
+    st.subheader("Extracted Information")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Vendor", result.get('vendor', 'Not detected'))
+        st.metric("Amount", f"${result.get('amount', 0):.2f}" if result.get('amount') else "Not detected")
+    
+    with col2:
+        st.metric("Category", result.get('category', 'Not categorized'))
+        if result.get('transaction_date'):
+            date_str = result['transaction_date'][:10]  # Extract date part
+            st.metric("Date", date_str)
+        else:
+            st.metric("Date", "Not detected")
+    
+    # Confidence score
+    if result.get('confidence_score'):
+        confidence = result['confidence_score'] * 100
+        st.progress(confidence / 100)
+        st.caption(f"OCR Confidence: {confidence:.1f}%")
+    
+    # Raw text (expandable)
+    if result.get('raw_text'):
+        with st.expander("View Raw Extracted Text"):
+            st.text(result['raw_text'])
 
 def view_receipts_page():
     """View all receipts page"""
     st.header("All Receipts")
+    refresh_button("refresh_view")
     
-    receipts = get_receipts()
+    # Cached DataFrame with dates already formatted for display
+    df = receipts_frame()
     
-    if not receipts:
+    if df.empty:
         st.info("No receipts found. Upload some receipts to get started!")
         return
     
-    # Convert to DataFrame for better display
-    df = pd.DataFrame(receipts)
-    
     # Display summary metrics
+    receipt_key = (len(df), int(df['id'].max()))
+    processed_count, total_amount, avg_amount = receipt_metrics(*receipt_key)
     col1, col2, col3, col4 = st.columns(4)
     with col1:
         st.metric("Total Receipts", len(df))
     with col2:
-        processed_count = len(df[df['processing_status'] == 'processed'])
         st.metric("Processed", processed_count)
     with col3:
-        total_amount = df[df['amount'].notna()]['amount'].sum()
         st.metric("Total Amount", f"${total_amount:.2f}")
     with col4:
-        avg_amount = df[df['amount'].notna()]['amount'].mean()
         st.metric("Average Amount", f"${avg_amount:.2f}" if not pd.isna(avg_amount) else "$0.00")
     
     # Filter options
     st.subheader("Filter Options")
     col1, col2, col3 = st.columns(3)
+    vendor_options, category_options = receipt_filter_options(*receipt_key)
     
     with col1:
         status_filter = st.selectbox("Status", ["All", "processed", "pending", "failed"])
     with col2:
-        vendors = ["All"] + list(df[df['vendor'].notna()]['vendor'].unique())
+        vendors = ["All"] + vendor_options
         vendor_filter = st.selectbox("Vendor", vendors)
     with col3:
-        categories = ["All"] + list(df[df['category'].notna()]['category'].unique())
+        categories = ["All"] + category_options
         category_filter = st.selectbox("Category", categories)
     
     # Apply filters
-    filtered_df = df.copy()
+    filtered_df = df
     if status_filter != "All":
         filtered_df = filtered_df[filtered_df['processing_status'] == status_filter]
     if vendor_filter != "All":
@@ -261,12 +549,13 @@ def view_receipts_page():
     
     # Select columns to display
     display_columns = ['id', 'filename', 'vendor', 'amount', 'category', 'transaction_date', 'processing_status']
-    display_df = filtered_df[display_columns].copy()
     
     # Format the display
-    if not display_df.empty:
-        display_df['amount'] = display_df['amount'].apply(lambda x: f"${x:.2f}" if pd.notna(x) else "N/A")
-        display_df['transaction_date'] = pd.to_datetime(display_df['transaction_date']).dt.strftime('%Y-%m-%d')
+    if not filtered_df.empty:
+        display_df = filtered_df.loc[:, display_columns].assign(
+            amount=format_amounts(filtered_df['amount']),
+            transaction_date=filtered_df['transaction_date_str']
+        )
         
         st.dataframe(
             display_df,
@@ -335,29 +624,21 @@ def search_page():
         }
         
         with st.spinner("Searching..."):
-            # Make search request
-            search_payload = {
-                "filters": filters,
-                "sort": sort_options
-            }
-            
             try:
-                response = requests.post(f"{API_BASE_URL}/receipts/search", json=filters)
-                results = response.json() if response.status_code == 200 else []
+                # Repeating a search reuses the cached frame and skips the API
+                results_df = search_receipts(filters, sort_options)
                 
-                st.subheader(f"Search Results ({len(results)} found)")
+                st.subheader(f"Search Results ({len(results_df)} found)")
                 
-                if results:
-                    # Convert to DataFrame
-                    results_df = pd.DataFrame(results)
+                if not results_df.empty:
                     display_columns = ['id', 'filename', 'vendor', 'amount', 'category', 'transaction_date']
                     
-                    if not results_df.empty:
-                        display_df = results_df[display_columns].copy()
-                        display_df['amount'] = display_df['amount'].apply(lambda x: f"${x:.2f}" if pd.notna(x) else "N/A")
-                        display_df['transaction_date'] = pd.to_datetime(display_df['transaction_date']).dt.strftime('%Y-%m-%d')
-                        
-                        st.dataframe(display_df, use_container_width=True, hide_index=True)
+                    display_df = results_df.loc[:, display_columns].assign(
+                        amount=format_amounts(results_df['amount']),
+                        transaction_date=results_df['transaction_date_str']
+                    )
+                    
+                    st.dataframe(display_df, use_container_width=True, hide_index=True)
                 else:
                     st.info("No results found for your search criteria.")
                     
@@ -368,26 +649,25 @@ def manual_correction_page():
     """Manual correction page for editing receipt fields"""
     st.header(" Manual Field Correction")
     
-    st.markdown("""
-    <div class="upload-section">
-        <h3> Correct Receipt Data</h3>
-        <p>Select a receipt and manually correct any parsing errors</p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(CORRECTION_BANNER_HTML, unsafe_allow_html=True)
     
-    # Get all receipts
-    receipts = get_receipts()
+    # Only the columns the selector needs; the full receipt is fetched once one is picked
+    refresh_button("refresh_correction")
+    receipt_index = get_receipt_index()
     
-    if not receipts:
+    if not receipt_index:
         st.warning("No receipts found. Please upload some receipts first.")
         return
     
     # Receipt selection
-    receipt_options = {f"ID {r['id']}: {r['filename']} - {r.get('vendor', 'Unknown')}": r for r in receipts}
+    receipt_options = {f"ID {r['id']}: {r['filename']} - {r.get('vendor', 'Unknown')}": r['id'] for r in receipt_index}
     selected_receipt_key = st.selectbox("Select Receipt to Correct:", list(receipt_options.keys()))
     
     if selected_receipt_key:
-        selected_receipt = receipt_options[selected_receipt_key]
+        selected_receipt = get_receipt(receipt_options[selected_receipt_key])
+        if not selected_receipt:
+            st.error("Unable to load the selected receipt.")
+            return
         
         st.subheader(f"Editing Receipt: {selected_receipt['filename']}")
         
@@ -463,18 +743,13 @@ def export_page():
     """Export data page"""
     st.header(" Export Receipt Data")
     
-    st.markdown("""
-    <div class="upload-section">
-        <h3> Export Your Data</h3>
-        <p>Export receipt data as CSV or JSON with optional filtering</p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(EXPORT_BANNER_HTML, unsafe_allow_html=True)
     
     # Export format selection
     col1, col2 = st.columns(2)
     
     with col1:
-        export_format = st.selectbox("Export Format:", ["csv", "json"])
+        export_format = st.selectbox("Export Format:", ["csv", "json", "parquet"])
     
     with col2:
         # Field selection
@@ -524,7 +799,7 @@ def export_page():
             
             if export_data:
                 filename = f"receipts_export.{export_format}"
-                mime_type = "text/csv" if export_format == "csv" else "application/json"
+                mime_type = EXPORT_MIME_TYPES[export_format]
                 
                 st.download_button(
                     label=f" Download {export_format.upper()} File",
@@ -538,37 +813,31 @@ def export_page():
     
     # Preview section
     st.subheader(" Data Preview")
-    receipts = get_receipts()
-    if receipts:
-        # Apply filters for preview
-        filtered_receipts = receipts
-        if filters:
-            # Simple client-side filtering for preview
-            if 'vendor' in filters:
-                filtered_receipts = [r for r in filtered_receipts if filters['vendor'].lower() in (r.get('vendor', '') or '').lower()]
-            if 'category' in filters:
-                filtered_receipts = [r for r in filtered_receipts if r.get('category') == filters['category']]
+    refresh_button("refresh_export")
+    receipts_df = receipts_frame()
+    if not receipts_df.empty:
+        # Simple client-side filtering for preview, as vectorized masks
+        mask = pd.Series(True, index=receipts_df.index)
+        if 'vendor' in filters:
+            mask &= receipts_df['vendor'].str.contains(filters['vendor'], case=False, regex=False, na=False)
+        if 'category' in filters:
+            mask &= receipts_df['category'] == filters['category']
+        filtered_df = receipts_df[mask]
         
-        st.info(f"Found {len(filtered_receipts)} receipts matching your criteria")
+        st.info(f"Found {len(filtered_df)} receipts matching your criteria")
         
-        if filtered_receipts:
-            # Show first few records as preview
-            preview_data = []
-            for receipt in filtered_receipts[:5]:  # Show first 5
-                row = {}
-                for field in (selected_fields or available_fields):
-                    row[field] = receipt.get(field, '')
-                preview_data.append(row)
-            
-            df = pd.DataFrame(preview_data)
+        if not filtered_df.empty:
+            # Show first 5 records as preview, selecting the columns in one step
+            df = filtered_df.head(5).reindex(columns=selected_fields or available_fields)
             st.dataframe(df, use_container_width=True)
             
-            if len(filtered_receipts) > 5:
-                st.info(f"Showing first 5 records. Total: {len(filtered_receipts)} records will be exported.")
+            if len(filtered_df) > 5:
+                st.info(f"Showing first 5 records. Total: {len(filtered_df)} records will be exported.")
 
 def analytics_page():
     """Analytics and visualizations page"""
     st.header(" Analytics Dashboard")
+    refresh_button("refresh_analytics")
     
     analytics = get_analytics()
     
@@ -599,30 +868,25 @@ def analytics_page():
         
         with col1:
             # Top vendors by amount (bar chart)
-            vendor_df = pd.DataFrame(top_vendors[:10])
-            fig_vendors = px.bar(
-                vendor_df, 
-                x='total_amount', 
-                y='vendor',
-                orientation='h',
+            vendor_df = chart_frame(top_vendors[:10])
+            # Data is already aggregated, so build graph objects directly (no express groupby)
+            # Numeric columns go in as narrow typed NumPy arrays, which Plotly serializes as base64
+            fig_vendors = go.Figure(go.Bar(x=vendor_df['total_amount'].to_numpy(), y=vendor_df['vendor'], orientation='h'))
+            fig_vendors.update_layout(
                 title="Top 10 Vendors by Total Spending",
-                labels={'total_amount': 'Total Amount ($)', 'vendor': 'Vendor'}
+                xaxis_title="Total Amount ($)",
+                yaxis_title="Vendor",
+                height=400
             )
-            fig_vendors.update_layout(height=400)
             st.plotly_chart(fig_vendors, use_container_width=True)
         
         with col2:
             # Vendor distribution (pie chart)
             vendor_dist = analytics.get('vendor_distribution', [])[:8]  # Top 8 for readability
             if vendor_dist:
-                vendor_dist_df = pd.DataFrame(vendor_dist)
-                fig_pie = px.pie(
-                    vendor_dist_df,
-                    values='count',
-                    names='vendor',
-                    title="Vendor Distribution (by Transaction Count)"
-                )
-                fig_pie.update_layout(height=400)
+                vendor_dist_df = chart_frame(vendor_dist)
+                fig_pie = go.Figure(go.Pie(values=vendor_dist_df['count'].to_numpy(), labels=vendor_dist_df['vendor']))
+                fig_pie.update_layout(title="Vendor Distribution (by Transaction Count)", height=400)
                 st.plotly_chart(fig_pie, use_container_width=True)
     
     # Category Analysis
@@ -634,26 +898,20 @@ def analytics_page():
         
         with col1:
             # Category distribution (bar chart)
-            cat_df = pd.DataFrame(category_dist)
-            fig_cat = px.bar(
-                cat_df,
-                x='category',
-                y='count',
+            cat_df = chart_frame(category_dist)
+            fig_cat = go.Figure(go.Bar(x=cat_df['category'], y=cat_df['count'].to_numpy()))
+            fig_cat.update_layout(
                 title="Spending by Category",
-                labels={'count': 'Number of Transactions', 'category': 'Category'}
+                xaxis_title="Category",
+                yaxis_title="Number of Transactions",
+                height=400
             )
-            fig_cat.update_layout(height=400)
             st.plotly_chart(fig_cat, use_container_width=True)
         
         with col2:
             # Category pie chart
-            fig_cat_pie = px.pie(
-                cat_df,
-                values='count',
-                names='category',
-                title="Category Distribution"
-            )
-            fig_cat_pie.update_layout(height=400)
+            fig_cat_pie = go.Figure(go.Pie(values=cat_df['count'].to_numpy(), labels=cat_df['category']))
+            fig_cat_pie.update_layout(title="Category Distribution", height=400)
             st.plotly_chart(fig_cat_pie, use_container_width=True)
     
     # Time Series Analysis
@@ -662,15 +920,18 @@ def analytics_page():
     
     if monthly_trends:
         # Monthly spending trend
-        trends_df = pd.DataFrame(monthly_trends)
+        trends_df = chart_frame(monthly_trends)
         trends_df['month_date'] = pd.to_datetime(trends_df['month'] + '-01')
         
         fig_trend = go.Figure()
         
+        # SVG scatter is fine for small series; switch to WebGL once it gets large
+        scatter = go.Scattergl if len(trends_df) > WEBGL_POINT_THRESHOLD else go.Scatter
+        
         # Add total amount line
-        fig_trend.add_trace(go.Scatter(
-            x=trends_df['month_date'],
-            y=trends_df['total_amount'],
+        fig_trend.add_trace(scatter(
+            x=trends_df['month_date'].to_numpy(),
+            y=trends_df['total_amount'].to_numpy(),
             mode='lines+markers',
             name='Total Amount',
             line=dict(color='#1f77b4', width=3)
@@ -678,9 +939,9 @@ def analytics_page():
         
         # Add moving average if available
         if 'moving_avg_amount' in trends_df.columns:
-            fig_trend.add_trace(go.Scatter(
-                x=trends_df['month_date'],
-                y=trends_df['moving_avg_amount'],
+            fig_trend.add_trace(scatter(
+                x=trends_df['month_date'].to_numpy(),
+                y=trends_df['moving_avg_amount'].to_numpy(),
                 mode='lines',
                 name='Moving Average',
                 line=dict(color='#ff7f0e', width=2, dash='dash')
@@ -698,32 +959,40 @@ def analytics_page():
     daily_patterns = analytics.get('daily_patterns', [])
     if daily_patterns:
         st.subheader(" Daily Spending Patterns")
-        daily_df = pd.DataFrame(daily_patterns)
+        daily_df = chart_frame(daily_patterns)
         
-        fig_daily = px.bar(
-            daily_df,
-            x='day_of_week',
-            y='total_amount',
+        fig_daily = go.Figure(go.Bar(x=daily_df['day_of_week'], y=daily_df['total_amount'].to_numpy()))
+        fig_daily.update_layout(
             title="Spending by Day of Week",
-            labels={'total_amount': 'Total Amount ($)', 'day_of_week': 'Day of Week'}
+            xaxis_title="Day of Week",
+            yaxis_title="Total Amount ($)",
+            height=400
         )
-        fig_daily.update_layout(height=400)
         st.plotly_chart(fig_daily, use_container_width=True)
     
     # Amount Distribution
     amount_histogram = analytics.get('amount_histogram', [])
     if amount_histogram:
         st.subheader(" Amount Distribution")
-        hist_df = pd.DataFrame(amount_histogram)
+        hist_df = chart_frame(amount_histogram)
         
-        fig_hist = px.bar(
-            hist_df,
-            x='bin_center',
-            y='count',
+        if len(hist_df) > HISTOGRAM_BAR_LIMIT:
+            # One filled step path on the GPU instead of an SVG node per bin
+            fig_hist = go.Figure(go.Scattergl(
+                x=hist_df['bin_center'].to_numpy(),
+                y=hist_df['count'].to_numpy(),
+                mode='lines',
+                line_shape='hvh',
+                fill='tozeroy'
+            ))
+        else:
+            fig_hist = go.Figure(go.Bar(x=hist_df['bin_center'].to_numpy(), y=hist_df['count'].to_numpy()))
+        fig_hist.update_layout(
             title="Distribution of Transaction Amounts",
-            labels={'bin_center': 'Amount ($)', 'count': 'Number of Transactions'}
+            xaxis_title="Amount ($)",
+            yaxis_title="Number of Transactions",
+            height=400
         )
-        fig_hist.update_layout(height=400)
         st.plotly_chart(fig_hist, use_container_width=True)
 
 if __name__ == "__main__":
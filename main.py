@@ -1,29 +1,42 @@
-from fastapi import FastAPI, File, UploadFile, Depends, HTTPException, Query
+from fastapi import FastAPI, File, UploadFile, Depends, HTTPException, Query, Request, Response, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from contextlib import asynccontextmanager
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import OrderedDict
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import select, insert, update, bindparam, func
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from pathlib import PurePosixPath
 import os
-import shutil
 from datetime import datetime
 import logging
 import json
 import csv
 import io
+import pandas as pd
+import threading
+import secrets
+import hashlib
+import time
+import asyncio
+import orjson
 
 # Import our modules
-from models.database import get_db, create_tables, Receipt
+from models.database import get_db, create_tables, Receipt, ReceiptRow, SessionLocal
 from schemas.receipt_schemas import (
     ReceiptResponse, ReceiptCreate, ReceiptUpdate, 
     SearchFilters, SortOptions, AggregationResponse,
-    ManualCorrectionRequest, ExportRequest, CurrencyInfo
+    ManualCorrectionRequest, ExportRequest, CurrencyInfo, UploadJobStatus
 )
-from services.ocr_service import OCRService
+from services.ocr_service import OCRService, FileSource, extract_text_in_worker, extract_pdf_pages_in_worker
 from services.text_parser import TextParser
 from services.currency_service import CurrencyService
-from algorithms.search_algorithms import SearchAlgorithms
-from algorithms.sort_algorithms import SortAlgorithms
+from services.receipt_writer import ReceiptBatchWriter
+from algorithms.search_algorithms import SearchAlgorithms, substring_condition
 from algorithms.aggregation_algorithms import AggregationAlgorithms
 
 # Configure logging
@@ -34,8 +47,11 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Initialize database and services on startup"""
     create_tables()
+    requeue_pending_uploads()
     logger.info("Application started successfully")
     yield
+    upload_executor.shutdown(wait=False)
+    ocr_pool.shutdown(wait=False)
     logger.info("Application shutting down")
 
 # Create FastAPI app
@@ -46,23 +62,576 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-# Add CORS middleware
+# Browser origins allowed to call the API (comma-separated CORS_ORIGINS overrides the local dashboard)
+CORS_ORIGINS = os.environ.get("CORS_ORIGINS", "http://localhost:8501,http://127.0.0.1:8501").split(",")
+
+# Add CORS middleware with explicit lists, letting browsers cache preflight responses for a day
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Configure appropriately for production
+    allow_origins=[origin.strip() for origin in CORS_ORIGINS if origin.strip()],
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "HEAD", "POST", "PUT", "DELETE"],
+    allow_headers=["Content-Type", "If-None-Match"],
+    expose_headers=["ETag", "Content-Disposition", "X-Next-After-Id"],
+    max_age=86400,
 )
 
 # Create uploads directory
 UPLOAD_DIR = "uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+# Columns the slim receipt index endpoint may project
+INDEX_FIELDS = ['id', 'filename', 'vendor', 'category', 'amount', 'transaction_date', 'upload_date', 'processing_status']
+
+# Statements built once at import; per-request values are bound parameters,
+# so every call reuses the same cached compiled SQL instead of rebuilding the construct
+SELECT_RECEIPT_BY_ID = select(Receipt).where(Receipt.id == bindparam("receipt_id"))
+# List pages select the table's columns as plain rows: read-only responses skip ORM object hydration
+SELECT_RECEIPT_PAGE = (
+    select(*Receipt.__table__.c).order_by(Receipt.id.desc()).offset(bindparam("skip")).limit(bindparam("limit"))
+)
+# Keyset page: seeks past the cursor on the primary key, so deep pages cost the same as the first
+SELECT_RECEIPT_PAGE_AFTER = (
+    select(*Receipt.__table__.c).where(Receipt.id < bindparam("after_id"))
+    .order_by(Receipt.id.desc()).limit(bindparam("limit"))
+)
+SELECT_RECEIPT_BY_HASH = select(Receipt).where(Receipt.content_hash == bindparam("content_hash"))
+
 # Initialize services
 ocr_service = OCRService()
 text_parser = TextParser()
 currency_service = CurrencyService()
+receipt_writer = ReceiptBatchWriter(SessionLocal)
+
+# File types accepted for upload
+SUPPORTED_UPLOAD_TYPES = frozenset({'jpg', 'jpeg', 'png', 'pdf', 'txt'})
+# Failures recorded as a failed receipt: invalid parsed data (pydantic ValidationError is a ValueError),
+# unreadable files and database errors. Anything else is a bug and propagates as a plain 500
+UPLOAD_PROCESSING_ERRORS = (ValueError, OSError, SQLAlchemyError)
+
+# Approximate size of each streamed export chunk, and block size for writing uploads to disk
+EXPORT_CHUNK_SIZE = 64 * 1024
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Rows fetched per round trip while an export streams
+EXPORT_BATCH_SIZE = 1000
+# Background upload jobs processed at once (UPLOAD_WORKERS); OCR inside them is still bounded by the OCR pool
+UPLOAD_WORKERS = int(os.environ.get("UPLOAD_WORKERS", 5))
+upload_executor = ThreadPoolExecutor(max_workers=UPLOAD_WORKERS)
+# Job status reported for each receipt processing status; a job's id is its receipt's id
+JOB_STATUSES = {"pending": "processing", "processed": "done", "failed": "failed"}
+
+# CPU-bound OCR (image preprocessing, PDF parsing) runs in worker processes, one per core by default
+# (OCR_CONCURRENCY overrides); worker processes start on the first submitted file
+OCR_POOL_FILE_TYPES = {'jpg', 'jpeg', 'png', 'pdf'}
+# Pages per OCR pool task when a longer PDF is split across workers
+PDF_PAGES_PER_TASK = 4
+OCR_CONCURRENCY = int(os.environ.get("OCR_CONCURRENCY", os.cpu_count() or 1))
+ocr_pool = ProcessPoolExecutor(max_workers=OCR_CONCURRENCY)
+ocr_pool_lock = threading.Lock()
+# Uploads needing OCR beyond the pool size wait here, on the event loop, instead of
+# each holding a threadpool thread while their file sits in the pool's queue
+ocr_slots = asyncio.Semaphore(OCR_CONCURRENCY)
+# Content hash -> future receipt id for uploads currently being processed, so identical concurrent uploads run OCR once
+uploads_in_flight: Dict[str, Future] = {}
+uploads_in_flight_lock = threading.Lock()
+
+# Analytics responses cached per (endpoint, params, data version) for a short TTL
+ANALYTICS_CACHE_TTL = 30
+ANALYTICS_CACHE_SIZE = 64
+SELECT_ANALYTICS_VERSION = select(func.count(Receipt.id), func.max(Receipt.id)).where(
+    Receipt.processing_status == "processed"
+)
+analytics_cache = OrderedDict()
+analytics_cache_lock = threading.Lock()
+# Bumped on every receipt write through the API, since edits keep COUNT and MAX(id) unchanged
+analytics_generation = 0
+
+class FastJSONResponse(Response):
+    """
+    JSON response rendered by orjson, for endpoints returning plain dicts and lists
+    Endpoints with a response_model keep FastAPI's default class, which already serializes in pydantic-core
+    """
+    media_type = "application/json"
+    
+    def render(self, content: Any) -> bytes:
+        # Datetimes and numpy scalars serialize natively; int dict keys become strings as with json
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+def find_receipt(db: Session, receipt_id: int) -> Optional[Receipt]:
+    """Load one receipt by id, or None"""
+    return db.execute(SELECT_RECEIPT_BY_ID, {"receipt_id": receipt_id}).scalar_one_or_none()
+
+def refresh_derived_data(db: Session, receipt_id: int, before: Optional[ReceiptRow] = None):
+    """
+    Propagate a committed receipt write to cached analytics and search indexes
+    before is the receipt's aggregation snapshot taken prior to the write
+    """
+    global analytics_generation
+    receipt = find_receipt(db, receipt_id)
+    AggregationAlgorithms.record_receipt_change(db, before, AggregationAlgorithms.snapshot(receipt))
+    AggregationAlgorithms.clear_analysis_cache()
+    with analytics_cache_lock:
+        analytics_generation += 1
+        analytics_cache.clear()
+    SearchAlgorithms(db).refresh_indexes([receipt_id])
+
+def cached_analytics(request: Request, db: Session, params: Tuple, compute: Callable[[], Dict[str, Any]]) -> Response:
+    """
+    Serve an analytics response from the TTL cache, recomputing it only when stale
+    Entries hold the rendered JSON bytes, so cache hits skip serialization entirely
+    The ETag is a hash of the cached body, so a client holding it gets 304 Not Modified only while
+    a fresh entry still has that exact content
+    """
+    count, max_id = db.execute(SELECT_ANALYTICS_VERSION).one()
+    key = (request.url.path, params, count, max_id, analytics_generation)
+    
+    with analytics_cache_lock:
+        entry = analytics_cache.get(key)
+    if entry is None or time.monotonic() - entry[0] > ANALYTICS_CACHE_TTL:
+        body = FastJSONResponse(compute()).body
+        entry = (time.monotonic(), body, '"' + hashlib.sha1(body).hexdigest()[:16] + '"')
+        with analytics_cache_lock:
+            analytics_cache[key] = entry
+            analytics_cache.move_to_end(key)
+            while len(analytics_cache) > ANALYTICS_CACHE_SIZE:
+                analytics_cache.popitem(last=False)
+    
+    _, body, etag = entry
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+def stored_upload_path(content_hash: str, file_extension: str) -> str:
+    """
+    Path of an upload's stored file, named by its content hash rather than the client's filename
+    The original filename is only kept as receipt metadata, so it never reaches the filesystem
+    """
+    return os.path.join(UPLOAD_DIR, f"{content_hash}.{file_extension}")
+
+def receipt_file_path(receipt: Receipt) -> Optional[str]:
+    """
+    Stored file of a receipt
+    Processed rows saved before hash naming used the bare original filename; failed uploads keep no file
+    """
+    if receipt.content_hash:
+        return stored_upload_path(receipt.content_hash, receipt.file_type)
+    if receipt.processing_status != "failed" and receipt.filename:
+        return os.path.join(UPLOAD_DIR, os.path.basename(receipt.filename))
+    return None
+
+def store_upload(source, file_extension: str) -> Tuple[FileSource, str]:
+    """
+    Copy an upload to a temporary file, then move it to its content-addressed path
+    Returns (OCR source, SHA-256 of the bytes)
+    """
+    temp_path = os.path.join(UPLOAD_DIR, f"{secrets.token_hex(8)}.part")
+    try:
+        content, content_hash = copy_upload(source, temp_path)
+    except BaseException:
+        remove_upload_file(temp_path)
+        raise
+    
+    # Identical bytes land on the same file, so replacing an existing one changes nothing
+    file_path = stored_upload_path(content_hash, file_extension)
+    os.replace(temp_path, file_path)
+    return (file_path if isinstance(content, str) else content), content_hash
+
+def copy_upload(source, file_path: str) -> Tuple[FileSource, str]:
+    """
+    Copy an upload's spooled file to disk and hash it
+    Small uploads still in memory are copied in UPLOAD_CHUNK_SIZE blocks, keeping the bytes for OCR
+    Uploads the spool already rolled over to disk are copied kernel-side and OCR reads the saved file
+    Returns (OCR source, SHA-256 of the bytes)
+    """
+    # Same check Starlette uses: a SpooledTemporaryFile that has not rolled over has no real file descriptor
+    if getattr(source, "_rolled", True) and hasattr(os, "sendfile"):
+        try:
+            return file_path, sendfile_upload(source, file_path)
+        except OSError as e:
+            logger.warning(f"sendfile copy failed, falling back to buffered copy: {str(e)}")
+    
+    source.seek(0)
+    content = io.BytesIO()
+    hasher = hashlib.sha256()
+    with open(file_path, "wb") as buffer:
+        while chunk := source.read(UPLOAD_CHUNK_SIZE):
+            buffer.write(chunk)
+            content.write(chunk)
+            hasher.update(chunk)
+    return content.getvalue(), hasher.hexdigest()
+
+def sendfile_upload(source, file_path: str) -> str:
+    """
+    Copy a disk-backed upload with os.sendfile (no user-space buffer), then hash it
+    Returns the SHA-256 of the bytes
+    """
+    size = source.seek(0, os.SEEK_END)
+    with open(file_path, "wb") as buffer:
+        offset = 0
+        while offset < size:
+            sent = os.sendfile(buffer.fileno(), source.fileno(), offset, size - offset)
+            if sent == 0:
+                break
+            offset += sent
+    
+    # Hash from the spool, which the copy just left in the page cache
+    source.seek(0)
+    hasher = hashlib.sha256()
+    while chunk := source.read(UPLOAD_CHUNK_SIZE):
+        hasher.update(chunk)
+    return hasher.hexdigest()
+
+async def save_upload(file: UploadFile) -> Tuple[str, FileSource, str]:
+    """
+    Validate an uploaded file's type and store it in the upload directory
+    The copy runs in the threadpool so the event loop keeps serving other requests
+    Returns (file extension, OCR source (bytes or saved path), SHA-256 of the bytes)
+    """
+    file_extension = PurePosixPath(file.filename or "").suffix[1:].lower()
+    
+    if file_extension not in SUPPORTED_UPLOAD_TYPES:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Unsupported file type. Supported: {', '.join(sorted(SUPPORTED_UPLOAD_TYPES))}"
+        )
+    
+    content, content_hash = await run_in_threadpool(store_upload, file.file, file_extension)
+    
+    logger.info(f"File uploaded: {file.filename}")
+    return file_extension, content, content_hash
+
+def process_receipt_file(db: Session, filename: str, file_extension: str, content: FileSource, content_hash: str) -> Receipt:
+    """
+    Run OCR and parsing on an upload's bytes (or saved file, for large uploads) and save the processed receipt
+    Byte-identical files resolve to the receipt already stored for them
+    """
+    existing = db.execute(SELECT_RECEIPT_BY_HASH, {"content_hash": content_hash}).scalar_one_or_none()
+    if existing is not None:
+        logger.info(f"Duplicate upload {filename}: matches receipt ID {existing.id}")
+        return existing
+    
+    # End this session's read transaction so its pooled connection is free during OCR and the batched write
+    db.rollback()
+    
+    with uploads_in_flight_lock:
+        in_flight = uploads_in_flight.get(content_hash)
+        leader = in_flight is None
+        if leader:
+            in_flight = uploads_in_flight[content_hash] = Future()
+    
+    if not leader:
+        # The same bytes are already being processed; share that receipt (or failure) instead of repeating the OCR
+        logger.info(f"Duplicate upload {filename}: waiting for the in-flight upload of the same file")
+        return find_receipt(db, in_flight.result())
+    
+    try:
+        receipt_id = save_processed_receipt(db, filename, file_extension, content, content_hash)
+        in_flight.set_result(receipt_id)
+    except BaseException as e:
+        in_flight.set_exception(e)
+        raise
+    finally:
+        with uploads_in_flight_lock:
+            del uploads_in_flight[content_hash]
+    
+    return find_receipt(db, receipt_id)
+
+def save_processed_receipt(db: Session, filename: str, file_extension: str, content: FileSource, content_hash: str) -> int:
+    """Run OCR and parsing on an upload and insert the processed receipt; returns its id"""
+    values = extract_receipt_values(filename, file_extension, content)
+    
+    # Save to database; the batch writer shares one commit among concurrent uploads
+    try:
+        receipt_id = receipt_writer.submit(dict(values, processing_status="processed", content_hash=content_hash))
+    except IntegrityError:
+        # A queued upload of the same bytes committed first
+        return db.execute(SELECT_RECEIPT_BY_HASH, {"content_hash": content_hash}).scalar_one().id
+    
+    refresh_derived_data(db, receipt_id)
+    
+    logger.info(f"Receipt processed successfully: ID {receipt_id}")
+    return receipt_id
+
+def extract_receipt_values(filename: str, file_extension: str, content: FileSource) -> Dict[str, Any]:
+    """Run OCR and parsing on an upload and return the receipt's column values"""
+    # Extract text using OCR service, from memory when the upload was small enough to keep there
+    raw_text, confidence_score = extract_text(content, file_extension)
+    
+    # Parse structured data
+    parsed_data = text_parser.parse_receipt_data(raw_text)
+    
+    # Column values for the receipt, built once from the parsed data
+    values = dict(
+        filename=filename,
+        file_type=file_extension,
+        raw_text=raw_text,
+        confidence_score=confidence_score,
+        vendor=parsed_data.get('vendor'),
+        transaction_date=parsed_data.get('transaction_date'),
+        amount=parsed_data.get('amount'),
+        category=parsed_data.get('category')
+    )
+    # Check the length and range limits ReceiptResponse relies on; the values themselves are stored as-is
+    ReceiptCreate.model_validate(values)
+    return values
+
+def extract_text(content: FileSource, file_extension: str):
+    """
+    Run OCR for one upload, in the process pool for images and PDFs
+    The calling thread waits on the result while other requests keep running
+    """
+    if file_extension not in OCR_POOL_FILE_TYPES:
+        return ocr_service.extract_text(content, file_extension)
+    
+    pool = ocr_pool
+    try:
+        if file_extension == 'pdf':
+            text = extract_pdf_text_split(pool, content)
+            if text:
+                return text, 1.0  # Same confidence as whole-document pdfplumber extraction
+        return pool.submit(extract_text_in_worker, content, file_extension).result()
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory); replace the pool and run this file in-process
+        replace_ocr_pool(pool)
+        return ocr_service.extract_text(content, file_extension)
+
+def replace_ocr_pool(broken: ProcessPoolExecutor):
+    """
+    Swap a fresh process pool in for a broken one and shut the broken one down
+    Uploads that hit the same failure together replace it only once
+    """
+    global ocr_pool
+    with ocr_pool_lock:
+        if ocr_pool is not broken:
+            return
+        logger.warning("OCR process pool broke; restarting it")
+        ocr_pool = ProcessPoolExecutor(max_workers=OCR_CONCURRENCY)
+    broken.shutdown(wait=False)
+
+def extract_pdf_text_split(pool: ProcessPoolExecutor, content: FileSource) -> str:
+    """
+    Extract a saved PDF's text with its page ranges spread across the OCR pool
+    The first range's task also reports the page count, so the PDF is never parsed on the request thread.
+    Only saved files are split: workers reopen the path, while in-memory bytes would be pickled once per range
+    Returns "" for in-memory uploads, or when any range fails or finds no text, so the caller runs the usual
+    single-task extraction
+    """
+    if not isinstance(content, str):
+        return ""
+    
+    try:
+        first_text, page_count = pool.submit(extract_pdf_pages_in_worker, content, 0, PDF_PAGES_PER_TASK).result()
+        futures = [
+            pool.submit(extract_pdf_pages_in_worker, content, start, start + PDF_PAGES_PER_TASK)
+            for start in range(PDF_PAGES_PER_TASK, page_count, PDF_PAGES_PER_TASK)
+        ]
+        text = (first_text + "".join(future.result()[0] for future in futures)).strip()
+    except BrokenProcessPool:
+        raise
+    except Exception as e:
+        logger.warning(f"Split PDF extraction failed, extracting as one task: {str(e)}")
+        return ""
+    
+    if text:
+        logger.info(f"PDF text extracted using pdfplumber across {len(futures) + 1} tasks")
+    return text
+
+def remove_upload_file(file_path: str):
+    """Delete a stored upload, ignoring files that are already gone"""
+    try:
+        os.unlink(file_path)
+    except FileNotFoundError:
+        pass
+
+def record_failed_upload(db: Session, filename: str, file_extension: str, content_hash: str, error: Exception):
+    """
+    Save a failed record for an upload that could not be processed, as one INSERT and commit
+    Failed receipts keep no content hash, so their stored file is removed rather than orphaned
+    """
+    try:
+        db.rollback()
+        db.execute(insert(Receipt).values(
+            filename=filename,
+            file_type=file_extension,
+            processing_status="failed",
+            error_message=str(error)
+        ))
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"Could not record failed upload {filename}: {str(e)}")
+    discard_upload_file(db, content_hash, file_extension)
+
+def discard_upload_file(db: Session, content_hash: str, file_extension: str):
+    """Remove an upload's stored file unless a receipt of the same bytes still owns it"""
+    try:
+        owned = db.execute(SELECT_RECEIPT_BY_HASH, {"content_hash": content_hash}).first() is not None
+        db.rollback()
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"Could not check owner of stored upload {content_hash}: {str(e)}")
+        return
+    if not owned:
+        remove_upload_file(stored_upload_path(content_hash, file_extension))
+
+def export_rows(stmt, fields: List[str]):
+    """
+    Yield each exported receipt as a list of values in fields order (None for fields that are not columns)
+    Rows are fetched EXPORT_BATCH_SIZE at a time by a session of its own, open only while the response streams
+    """
+    table_columns = Receipt.__table__.c
+    columns = list(dict.fromkeys(field for field in fields if field in table_columns)) or ['id']
+    positions = [columns.index(field) if field in table_columns else None for field in fields]
+    
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            stmt.with_only_columns(*(table_columns[name] for name in columns))
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        for row in rows:
+            yield [None if position is None else row[position] for position in positions]
+    finally:
+        db.close()
+
+def isoformat_dates(values: List[Any]) -> List[Any]:
+    """Render datetimes in an export row as ISO 8601 strings"""
+    return [value.isoformat() if isinstance(value, datetime) else value for value in values]
+
+def csv_export_chunks(rows, fields: List[str]):
+    """Yield a CSV export as UTF-8 byte chunks of roughly EXPORT_CHUNK_SIZE"""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    
+    # Write header
+    writer.writerow(fields)
+    
+    # Write data, flushing the buffer whenever it fills
+    for values in rows:
+        writer.writerow(isoformat_dates(values))
+        
+        if output.tell() >= EXPORT_CHUNK_SIZE:
+            yield output.getvalue().encode('utf-8')
+            output.seek(0)
+            output.truncate()
+    
+    yield output.getvalue().encode('utf-8')
+
+def json_export_chunks(rows, fields: List[str]):
+    """Yield a JSON array export, one object per receipt, as UTF-8 byte chunks of roughly EXPORT_CHUNK_SIZE"""
+    chunk = ["["]
+    size = 0
+    separator = "\n  "
+    
+    for values in rows:
+        item = json.dumps(dict(zip(fields, isoformat_dates(values))), default=str)
+        chunk.append(separator + item)
+        separator = ",\n  "
+        size += len(item)
+        
+        if size >= EXPORT_CHUNK_SIZE:
+            yield "".join(chunk).encode('utf-8')
+            chunk = []
+            size = 0
+    
+    chunk.append("\n]")
+    yield "".join(chunk).encode('utf-8')
+
+def enqueue_receipt(db: Session, filename: str, file_extension: str, content_hash: str) -> Tuple[Receipt, bool]:
+    """
+    Persist a pending receipt for a stored upload
+    Returns (receipt, created); byte-identical files resolve to the receipt already stored for them
+    """
+    existing = db.execute(SELECT_RECEIPT_BY_HASH, {"content_hash": content_hash}).scalar_one_or_none()
+    if existing is not None:
+        return existing, False
+    
+    try:
+        receipt_id = db.execute(insert(Receipt).values(
+            filename=filename,
+            file_type=file_extension,
+            processing_status="pending",
+            content_hash=content_hash
+        ).returning(Receipt.id)).scalar_one()
+        db.commit()
+    except IntegrityError:
+        # A concurrent upload of the same bytes committed first
+        db.rollback()
+        return db.execute(SELECT_RECEIPT_BY_HASH, {"content_hash": content_hash}).scalar_one(), False
+    
+    return find_receipt(db, receipt_id), True
+
+def run_upload_job(receipt_id: int, filename: str, file_extension: str, content: FileSource):
+    """
+    Worker body for a queued upload: fill in its pending receipt, or mark it failed
+    Uses its own session off the request thread
+    """
+    db = SessionLocal()
+    try:
+        values = extract_receipt_values(filename, file_extension, content)
+        db.execute(update(Receipt).where(Receipt.id == receipt_id).values(**values, processing_status="processed"))
+        db.commit()
+        refresh_derived_data(db, receipt_id)
+        logger.info(f"Receipt processed successfully: ID {receipt_id}")
+    except Exception as e:
+        if isinstance(e, UPLOAD_PROCESSING_ERRORS):
+            logger.error(f"Error processing receipt: {str(e)}")
+        else:
+            logger.exception(f"Unexpected error processing {filename}")
+        mark_upload_failed(db, receipt_id, e)
+    finally:
+        db.close()
+
+def mark_upload_failed(db: Session, receipt_id: int, error: Exception):
+    """
+    Mark a pending receipt failed
+    Its content hash is cleared, like other failed uploads, so uploading the file again retries it;
+    the stored file is removed first, since nothing would reference it afterwards
+    """
+    try:
+        db.rollback()
+        stored = db.execute(
+            select(Receipt.content_hash, Receipt.file_type).where(Receipt.id == receipt_id)
+        ).first()
+        if stored is not None and stored.content_hash:
+            remove_upload_file(stored_upload_path(stored.content_hash, stored.file_type))
+        db.execute(update(Receipt).where(Receipt.id == receipt_id).values(
+            processing_status="failed",
+            error_message=str(error),
+            content_hash=None
+        ))
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"Could not mark receipt {receipt_id} failed: {str(e)}")
+
+def requeue_pending_uploads():
+    """Resubmit receipts left pending by a restart, reading each from its stored file"""
+    db = SessionLocal()
+    try:
+        pending = db.execute(
+            select(Receipt.id, Receipt.filename, Receipt.file_type, Receipt.content_hash)
+            .where(Receipt.processing_status == "pending", Receipt.content_hash.is_not(None))
+        ).all()
+    finally:
+        db.close()
+    
+    for receipt_id, filename, file_extension, content_hash in pending:
+        upload_executor.submit(
+            run_upload_job, receipt_id, filename, file_extension, stored_upload_path(content_hash, file_extension)
+        )
+    if pending:
+        logger.info(f"Requeued {len(pending)} pending uploads")
+
+def job_status(receipt: Receipt) -> Dict[str, Any]:
+    """Upload job status for a receipt"""
+    status = JOB_STATUSES.get(receipt.processing_status, "processing")
+    return {
+        "job_id": str(receipt.id),
+        "status": status,
+        "receipt_id": receipt.id,
+        "error": receipt.error_message if status == "failed" else None
+    }
 
 @app.get("/")
 async def root():
@@ -87,129 +656,128 @@ async def upload_receipt(
     Upload and process a receipt file
     Supports .jpg, .png, .pdf, .txt formats
     """
+    file_extension, content, content_hash = await save_upload(file)
+    
     try:
-        # Validate file type
-        file_extension = file.filename.split('.')[-1].lower()
-        supported_types = ['jpg', 'jpeg', 'png', 'pdf', 'txt']
-        
-        if file_extension not in supported_types:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Unsupported file type. Supported: {', '.join(supported_types)}"
-            )
-        
-        # Save uploaded file
-        file_path = os.path.join(UPLOAD_DIR, file.filename)
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        logger.info(f"File uploaded: {file.filename}")
-        
-        # Extract text using OCR service
-        raw_text, confidence_score = ocr_service.extract_text(file_path, file_extension)
-        
-        # Parse structured data
-        parsed_data = text_parser.parse_receipt_data(raw_text)
+        # OCR and the sync session both block; keep them off the event loop
+        if file_extension in OCR_POOL_FILE_TYPES:
+            async with ocr_slots:
+                return await run_in_threadpool(process_receipt_file, db, file.filename, file_extension, content, content_hash)
+        return await run_in_threadpool(process_receipt_file, db, file.filename, file_extension, content, content_hash)
         
-        # Create receipt record
-        receipt_data = ReceiptCreate(
-            filename=file.filename,
-            file_type=file_extension,
-            raw_text=raw_text,
-            confidence_score=confidence_score,
-            vendor=parsed_data.get('vendor'),
-            transaction_date=parsed_data.get('transaction_date'),
-            amount=parsed_data.get('amount'),
-            category=parsed_data.get('category')
-        )
-        
-        # Save to database
-        db_receipt = Receipt(
-            filename=receipt_data.filename,
-            file_type=receipt_data.file_type,
-            raw_text=receipt_data.raw_text,
-            confidence_score=receipt_data.confidence_score,
-            vendor=receipt_data.vendor,
-            transaction_date=receipt_data.transaction_date,
-            amount=receipt_data.amount,
-            category=receipt_data.category,
-            processing_status="processed"
-        )
-        
-        db.add(db_receipt)
-        db.commit()
-        db.refresh(db_receipt)
-        
-        logger.info(f"Receipt processed successfully: ID {db_receipt.id}")
-        
-        return db_receipt
-        
-    except Exception as e:
+    except UPLOAD_PROCESSING_ERRORS as e:
         logger.error(f"Error processing receipt: {str(e)}")
-        
-        # Save failed record
-        try:
-            failed_receipt = Receipt(
-                filename=file.filename,
-                file_type=file_extension,
-                processing_status="failed",
-                error_message=str(e)
-            )
-            db.add(failed_receipt)
-            db.commit()
-        except:
-            pass
-        
+        await run_in_threadpool(record_failed_upload, db, file.filename, file_extension, content_hash, e)
         raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
 
+@app.post("/receipts/upload/jobs", response_model=UploadJobStatus, status_code=202)
+async def queue_receipt_upload(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db)
+):
+    """
+    Store a receipt file as a pending receipt and process it in the background
+    Returns a job id to poll at /receipts/job/{job_id}; pending receipts are requeued on restart
+    """
+    file_extension, content, content_hash = await save_upload(file)
+    
+    receipt, created = await run_in_threadpool(enqueue_receipt, db, file.filename, file_extension, content_hash)
+    if not created:
+        return job_status(receipt)
+    
+    upload_executor.submit(run_upload_job, receipt.id, file.filename, file_extension, content)
+    return {"job_id": str(receipt.id), "status": "queued", "receipt_id": receipt.id}
+
+@app.get("/receipts/job/{job_id}", response_model=UploadJobStatus)
+def get_upload_job(job_id: str, db: Session = Depends(get_db)):
+    """Get the status of a background upload job"""
+    receipt = find_receipt(db, int(job_id)) if job_id.isdigit() else None
+    if receipt is None:
+        raise HTTPException(status_code=404, detail="Upload job not found")
+    return job_status(receipt)
+
 @app.get("/receipts/", response_model=List[ReceiptResponse])
-async def list_receipts(
+def list_receipts(
+    response: Response,
+    after_id: Optional[int] = Query(None, description="Keyset cursor: return receipts older than this id"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     db: Session = Depends(get_db)
 ):
-    """Get list of all receipts with pagination"""
-    receipts = db.query(Receipt).offset(skip).limit(limit).all()
+    """
+    Get list of all receipts, newest first, with pagination
+    Pass the X-Next-After-Id header of a full page back as after_id to fetch the next one;
+    skip is kept for existing clients but scans every skipped row
+    """
+    if after_id is not None:
+        receipts = db.execute(SELECT_RECEIPT_PAGE_AFTER, {"after_id": after_id, "limit": limit}).all()
+    else:
+        receipts = db.execute(SELECT_RECEIPT_PAGE, {"skip": skip, "limit": limit}).all()
+    
+    if len(receipts) == limit:
+        response.headers["X-Next-After-Id"] = str(receipts[-1].id)
     return receipts
 
+@app.get("/receipts/ids", response_class=FastJSONResponse)
+def list_receipt_index(
+    fields: str = Query("id,filename,vendor", description="Comma-separated columns to return"),
+    db: Session = Depends(get_db)
+):
+    """Get a lightweight index of all receipts with only the requested columns"""
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unsupported = [field for field in requested if field not in INDEX_FIELDS]
+    if unsupported:
+        raise HTTPException(status_code=400, detail=f"Unsupported fields: {', '.join(unsupported)}")
+    
+    # Always include the id so rows can be fetched individually afterwards
+    if 'id' not in requested:
+        requested.insert(0, 'id')
+    
+    rows = db.query(*[getattr(Receipt, field) for field in requested]).order_by(Receipt.id).all()
+    # Returned as a response so FastAPI does not walk every row through jsonable_encoder first
+    return FastJSONResponse([dict(zip(requested, row)) for row in rows])
+
 @app.get("/receipts/{receipt_id}", response_model=ReceiptResponse)
-async def get_receipt(receipt_id: int, db: Session = Depends(get_db)):
+def get_receipt(receipt_id: int, db: Session = Depends(get_db)):
     """Get specific receipt by ID"""
-    receipt = db.query(Receipt).filter(Receipt.id == receipt_id).first()
+    receipt = find_receipt(db, receipt_id)
     if not receipt:
         raise HTTPException(status_code=404, detail="Receipt not found")
     return receipt
 
 @app.put("/receipts/{receipt_id}", response_model=ReceiptResponse)
-async def update_receipt(
+def update_receipt(
     receipt_id: int,
     receipt_update: ReceiptUpdate,
     db: Session = Depends(get_db)
 ):
     """Update receipt data"""
-    receipt = db.query(Receipt).filter(Receipt.id == receipt_id).first()
+    receipt = find_receipt(db, receipt_id)
     if not receipt:
         raise HTTPException(status_code=404, detail="Receipt not found")
+    before = AggregationAlgorithms.snapshot(receipt)
     
     # Update fields
-    for field, value in receipt_update.dict(exclude_unset=True).items():
+    for field, value in receipt_update.model_dump(exclude_unset=True).items():
         setattr(receipt, field, value)
     
     db.commit()
     db.refresh(receipt)
+    refresh_derived_data(db, receipt_id, before)
     return receipt
 
 @app.post("/receipts/{receipt_id}/correct")
-async def manual_correction(
+def manual_correction(
     receipt_id: int,
     correction: ManualCorrectionRequest,
     db: Session = Depends(get_db)
 ):
     """Apply manual corrections to receipt fields"""
     try:
-        receipt = db.query(Receipt).filter(Receipt.id == receipt_id).first()
+        receipt = find_receipt(db, receipt_id)
         if not receipt:
             raise HTTPException(status_code=404, detail="Receipt not found")
+        before = AggregationAlgorithms.snapshot(receipt)
         
         # Apply corrections
         if correction.vendor is not None:
@@ -230,28 +798,32 @@ async def manual_correction(
         
         db.commit()
         db.refresh(receipt)
+        refresh_derived_data(db, receipt_id, before)
         
         logger.info(f"Manual correction applied to receipt {receipt_id}")
-        return ReceiptResponse.from_orm(receipt)
+        return ReceiptResponse.model_validate(receipt)
         
     except Exception as e:
         logger.error(f"Manual correction error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Manual correction failed: {str(e)}")
 
 @app.delete("/receipts/{receipt_id}")
-async def delete_receipt(receipt_id: int, db: Session = Depends(get_db)):
+def delete_receipt(receipt_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """Delete receipt"""
     try:
-        receipt = db.query(Receipt).filter(Receipt.id == receipt_id).first()
+        receipt = find_receipt(db, receipt_id)
         if not receipt:
             raise HTTPException(status_code=404, detail="Receipt not found")
-        
-        # Delete file if it exists
-        if receipt.filename and os.path.exists(os.path.join(UPLOAD_DIR, receipt.filename)):
-            os.remove(os.path.join(UPLOAD_DIR, receipt.filename))
+        before = AggregationAlgorithms.snapshot(receipt)
+        file_path = receipt_file_path(receipt)
         
         db.delete(receipt)
         db.commit()
+        refresh_derived_data(db, receipt_id, before)
+        
+        # Remove the stored file after the response is sent, and only once the row is gone
+        if file_path:
+            background_tasks.add_task(remove_upload_file, file_path)
         
         logger.info(f"Receipt {receipt_id} deleted successfully")
         return {"message": "Receipt deleted successfully"}
@@ -261,7 +833,7 @@ async def delete_receipt(receipt_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Delete failed: {str(e)}")
 
 @app.post("/receipts/search", response_model=List[ReceiptResponse])
-async def search_receipts(
+def search_receipts(
     filters: SearchFilters,
     sort: Optional[SortOptions] = None,
     skip: int = Query(0, ge=0),
@@ -277,170 +849,156 @@ async def search_receipts(
         search_algo = SearchAlgorithms(db)
         
         # Convert filters to dict for multi-criteria search
-        filter_dict = filters.dict(exclude_unset=True)
-        
-        # Perform search
-        results = search_algo.multi_criteria_search(filter_dict)
-        
-        # Apply sorting if specified
-        if sort:
-            sort_algo = SortAlgorithms()
-            
-            if sort.field == "amount":
-                results = sort_algo.sort_by_amount(results, sort.direction == "desc")
-            elif sort.field in ["transaction_date", "upload_date"]:
-                results = sort_algo.sort_by_date(results, sort.field, sort.direction == "desc")
-            elif sort.field == "vendor":
-                results = sort_algo.sort_by_vendor(results, sort.direction == "desc")
-            elif sort.field == "category":
-                results = sort_algo.sort_by_category(results, sort.direction == "desc")
-        
-        # Apply pagination
-        paginated_results = results[skip:skip + limit]
-        
-        logger.info(f"Search completed: {len(results)} results found")
-        return paginated_results
+        filter_dict = filters.model_dump(exclude_unset=True)
+        
+        # Filter, sort and paginate in one query so only the requested page is read
+        results = search_algo.search_page(
+            filter_dict,
+            sort_field=sort.field if sort else None,
+            descending=bool(sort and sort.direction == "desc"),
+            skip=skip,
+            limit=limit
+        )
+        
+        logger.info(f"Search completed: {len(results)} results returned")
+        return results
         
     except Exception as e:
         logger.error(f"Search error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
 @app.get("/receipts/analytics/summary")
-async def get_analytics_summary(db: Session = Depends(get_db)):
+def get_analytics_summary(request: Request, db: Session = Depends(get_db)):
     """
     Get comprehensive analytics summary
     Demonstrates aggregation algorithms
     """
-    try:
-        # Get all receipts
-        receipts = db.query(Receipt).filter(Receipt.processing_status == "processed").all()
+    def compute():
+        # Aggregations run in the database over the processed receipts
+        processed = db.query(Receipt).filter(Receipt.processing_status == "processed")
         
         # Initialize aggregation algorithms
         agg_algo = AggregationAlgorithms(db)
         
         # Generate comprehensive analysis
-        analysis = agg_algo.comprehensive_analysis(receipts)
+        analysis = agg_algo.comprehensive_analysis(processed)
         
         logger.info("Analytics summary generated successfully")
         return analysis
+    
+    try:
+        return cached_analytics(request, db, (), compute)
         
     except Exception as e:
         logger.error(f"Analytics error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Analytics failed: {str(e)}")
 
 @app.get("/receipts/analytics/vendors")
-async def get_vendor_analytics(
+def get_vendor_analytics(
+    request: Request,
     limit: int = Query(10, ge=1, le=50),
     db: Session = Depends(get_db)
 ):
     """Get top vendors by spending"""
-    receipts = db.query(Receipt).filter(Receipt.processing_status == "processed").all()
-    agg_algo = AggregationAlgorithms(db)
+    def compute():
+        agg_algo = AggregationAlgorithms(db)
+        running = agg_algo.running_aggregates()
+        
+        return {
+            "top_vendors": agg_algo.top_vendors_by_amount(running, limit),
+            "vendor_distribution": agg_algo.vendor_frequency_distribution(running)
+        }
     
-    return {
-        "top_vendors": agg_algo.top_vendors_by_amount(receipts, limit),
-        "vendor_distribution": agg_algo.vendor_frequency_distribution(receipts)
-    }
+    return cached_analytics(request, db, (limit,), compute)
 
 @app.get("/receipts/analytics/trends")
-async def get_spending_trends(db: Session = Depends(get_db)):
+def get_spending_trends(request: Request, db: Session = Depends(get_db)):
     """Get spending trends and patterns"""
-    receipts = db.query(Receipt).filter(Receipt.processing_status == "processed").all()
-    agg_algo = AggregationAlgorithms(db)
+    def compute():
+        agg_algo = AggregationAlgorithms(db)
+        running = agg_algo.running_aggregates()
+        
+        return {
+            "monthly_trends": agg_algo.monthly_spending_trends(running),
+            "daily_patterns": agg_algo.spending_by_day_of_week(running),
+            "quarterly_analysis": agg_algo.quarterly_analysis(running)
+        }
     
-    return {
-        "monthly_trends": agg_algo.monthly_spending_trends(receipts),
-        "daily_patterns": agg_algo.spending_by_day_of_week(receipts),
-        "quarterly_analysis": agg_algo.quarterly_analysis(receipts)
-    }
+    return cached_analytics(request, db, (), compute)
 
 @app.get("/receipts/analytics/categories")
-async def get_category_analytics(db: Session = Depends(get_db)):
+def get_category_analytics(request: Request, db: Session = Depends(get_db)):
     """Get category-based analytics"""
-    receipts = db.query(Receipt).filter(Receipt.processing_status == "processed").all()
-    agg_algo = AggregationAlgorithms(db)
+    def compute():
+        processed = db.query(Receipt).filter(Receipt.processing_status == "processed")
+        agg_algo = AggregationAlgorithms(db)
+        
+        return {
+            "category_distribution": agg_algo.category_frequency_distribution(agg_algo.running_aggregates()),
+            "amount_histogram": agg_algo.amount_distribution_histogram(processed)
+        }
     
-    return {
-        "category_distribution": agg_algo.category_frequency_distribution(receipts),
-        "amount_histogram": agg_algo.amount_distribution_histogram(receipts)
-    }
+    return cached_analytics(request, db, (), compute)
 
 @app.post("/receipts/export")
-async def export_receipts(
+def export_receipts(
     export_request: ExportRequest,
     db: Session = Depends(get_db)
 ):
-    """Export receipts as CSV or JSON"""
+    """Export receipts as CSV, JSON or Parquet"""
     try:
-        # Get receipts based on filters
-        query = db.query(Receipt).filter(Receipt.processing_status == "processed")
+        # Select receipts based on filters; only the exported columns are read, when the response streams
+        stmt = select(Receipt.id).where(Receipt.processing_status == "processed")
         
         if export_request.filters:
             filters = export_request.filters
+            dialect = db.get_bind().dialect.name
             if filters.vendor:
-                query = query.filter(Receipt.vendor.ilike(f"%{filters.vendor}%"))
+                stmt = stmt.where(substring_condition(dialect, Receipt.vendor, filters.vendor))
             if filters.category:
-                query = query.filter(Receipt.category.ilike(f"%{filters.category}%"))
+                stmt = stmt.where(substring_condition(dialect, Receipt.category, filters.category))
             if filters.min_amount is not None:
-                query = query.filter(Receipt.amount >= filters.min_amount)
+                stmt = stmt.where(Receipt.amount >= filters.min_amount)
             if filters.max_amount is not None:
-                query = query.filter(Receipt.amount <= filters.max_amount)
+                stmt = stmt.where(Receipt.amount <= filters.max_amount)
             if filters.start_date:
-                query = query.filter(Receipt.transaction_date >= filters.start_date)
+                stmt = stmt.where(Receipt.transaction_date >= filters.start_date)
             if filters.end_date:
-                query = query.filter(Receipt.transaction_date <= filters.end_date)
-        
-        receipts = query.all()
+                stmt = stmt.where(Receipt.transaction_date <= filters.end_date)
         
         # Define default fields
         default_fields = ['id', 'filename', 'vendor', 'transaction_date', 'amount', 'category', 'upload_date']
         fields = export_request.include_fields or default_fields
         
         if export_request.format == "csv":
-            # Create CSV
-            output = io.StringIO()
-            writer = csv.writer(output)
-            
-            # Write header
-            writer.writerow(fields)
-            
-            # Write data
-            for receipt in receipts:
-                row = []
-                for field in fields:
-                    value = getattr(receipt, field, '')
-                    if isinstance(value, datetime):
-                        value = value.isoformat()
-                    row.append(value)
-                writer.writerow(row)
-            
-            # Create response
-            output.seek(0)
+            # Stream CSV in chunks instead of building the whole file in memory
             return StreamingResponse(
-                io.BytesIO(output.getvalue().encode('utf-8')),
+                csv_export_chunks(export_rows(stmt, fields), fields),
                 media_type="text/csv",
                 headers={"Content-Disposition": "attachment; filename=receipts.csv"}
             )
         
         elif export_request.format == "json":
-            # Create JSON
-            data = []
-            for receipt in receipts:
-                item = {}
-                for field in fields:
-                    value = getattr(receipt, field, None)
-                    if isinstance(value, datetime):
-                        value = value.isoformat()
-                    item[field] = value
-                data.append(item)
-            
-            json_str = json.dumps(data, indent=2, default=str)
+            # Stream the JSON array in chunks as rows arrive
             return StreamingResponse(
-                io.BytesIO(json_str.encode('utf-8')),
+                json_export_chunks(export_rows(stmt, fields), fields),
                 media_type="application/json",
                 headers={"Content-Disposition": "attachment; filename=receipts.json"}
             )
         
+        elif export_request.format == "parquet":
+            # Typed columnar binary; dates stay timestamps instead of ISO strings
+            # The file is written whole, so it is still built in memory
+            df = pd.DataFrame(list(export_rows(stmt, fields)), columns=fields)
+            output = io.BytesIO()
+            df.to_parquet(output, index=False, compression="zstd")
+            output.seek(0)
+            return StreamingResponse(
+                output,
+                media_type="application/vnd.apache.parquet",
+                headers={"Content-Disposition": "attachment; filename=receipts.parquet"}
+            )
+        
     except Exception as e:
         logger.error(f"Export error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
@@ -459,7 +1017,7 @@ async def get_supported_currencies():
         raise HTTPException(status_code=500, detail="Failed to get supported currencies")
 
 @app.post("/currency/convert")
-async def convert_currency(
+def convert_currency(
     amount: float,
     from_currency: str,
     to_currency: str = "USD"
@@ -488,14 +1046,14 @@ async def convert_currency(
         raise HTTPException(status_code=500, detail=f"Currency conversion failed: {str(e)}")
 
 @app.post("/receipts/{receipt_id}/currency-info")
-async def get_receipt_currency_info(
+def get_receipt_currency_info(
     receipt_id: int,
     target_currency: str = "USD",
     db: Session = Depends(get_db)
 ):
     """Get currency information for a specific receipt"""
     try:
-        receipt = db.query(Receipt).filter(Receipt.id == receipt_id).first()
+        receipt = find_receipt(db, receipt_id)
         if not receipt:
             raise HTTPException(status_code=404, detail="Receipt not found")
         
@@ -515,7 +1073,7 @@ async def get_receipt_currency_info(
         logger.error(f"Currency analysis error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Currency analysis failed: {str(e)}")
 
-@app.get("/health")
+@app.api_route("/health", methods=["GET", "HEAD"])
 async def health_check():
     """Health check endpoint"""
     return {
@@ -526,4 +1084,7 @@ async def health_check():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # "auto" selects the uvloop event loop and httptools parser when installed, else asyncio and h11.
+    # Keep one worker: upload job status, analytics cache versions and search indexes live in this
+    # process, and OCR already uses every core through ocr_pool
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, loop="auto", http="auto")
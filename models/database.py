@@ -1,11 +1,62 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text, Index
+from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text, Index, DDL, event, inspect, text, literal_column, func, table, column
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.engine import make_url
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
+from collections import namedtuple
+import os
 
 # Database configuration
-SQLALCHEMY_DATABASE_URL = "sqlite:///./database.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+SQLALCHEMY_DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite:///./database.db")
+
+# Connection pool sized for the API threadpool (40 threads) plus the upload and batch-writer threads.
+# Each uvicorn worker has its own pool, so N workers open up to N * (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+# connections, which must stay below a database server's max_connections
+DB_POOL_SIZE = 20
+DB_MAX_OVERFLOW = 40
+DB_POOL_TIMEOUT = 5  # seconds to wait for a free connection before failing the request
+DB_POOL_RECYCLE = 1800  # seconds before a server connection is replaced
+
+# Applied to every new SQLite connection. WAL lets readers (analytics, search) run alongside the upload writes
+# instead of waiting on them; with WAL, synchronous=NORMAL stays consistent and only risks the last commits on power loss
+SQLITE_PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",  # 256 MB of the file memory-mapped
+    "PRAGMA cache_size=-65536",  # 64 MB page cache per connection
+]
+
+def engine_options(url: str) -> dict:
+    """
+    Pool and driver options for the configured database
+    In-memory SQLite uses SQLAlchemy's single-connection pool, which takes no sizing options
+    """
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite":
+        options = {"connect_args": {"check_same_thread": False}}
+        if url.database and url.database != ":memory:" and url.query.get("mode") != "memory":
+            options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT)
+    else:
+        options = {"pool_size": DB_POOL_SIZE, "max_overflow": DB_MAX_OVERFLOW, "pool_timeout": DB_POOL_TIMEOUT}
+        # Servers close idle connections; test each on checkout and replace it before that happens
+        options.update(pool_pre_ping=True, pool_recycle=DB_POOL_RECYCLE)
+    return options
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Configure a new SQLite connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL))
+if engine.dialect.name == 'sqlite':
+    event.listen(engine, "connect", set_sqlite_pragmas)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -29,17 +80,114 @@ class Receipt(Base):
     confidence_score = Column(Float)  # OCR confidence if applicable
     processing_status = Column(String(50), default="pending")  # pending, processed, failed
     error_message = Column(Text)
+    content_hash = Column(String(64), unique=True, index=True)  # SHA-256 of the uploaded file, for duplicate detection
     
     # Additional indexes for compound queries
     __table_args__ = (
         Index('idx_vendor_date', 'vendor', 'transaction_date'),
         Index('idx_amount_date', 'amount', 'transaction_date'),
         Index('idx_category_date', 'category', 'transaction_date'),
+        Index('idx_status_date', 'processing_status', 'transaction_date'),  # Analytics filter on processed receipts
+        # Case-insensitive vendor/category sorts in search (ORDER BY lower(...) LIMIT) read these in order
+        Index('idx_vendor_lower', func.lower(vendor)),
+        Index('idx_category_lower', func.lower(category)),
     )
 
+# Trigram indexes for fuzzy vendor search and substring keyword search (PostgreSQL only)
+event.listen(
+    Receipt.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
+event.listen(
+    Receipt.__table__,
+    "after_create",
+    DDL(
+        "CREATE INDEX IF NOT EXISTS receipts_vendor_trgm "
+        "ON receipts USING gin (vendor gin_trgm_ops)"
+    ).execute_if(dialect="postgresql")
+)
+event.listen(
+    Receipt.__table__,
+    "after_create",
+    DDL(
+        "CREATE INDEX IF NOT EXISTS receipts_raw_text_trgm "
+        "ON receipts USING gin (raw_text gin_trgm_ops)"
+    ).execute_if(dialect="postgresql")
+)
+
+# Generated full-text vector over vendor and raw text with a GIN index (PostgreSQL only)
+# Not mapped on Receipt so SQLite schemas are unaffected; queries reference it as receipt_tsv
+TSV_DDL = [
+    "ALTER TABLE receipts ADD COLUMN IF NOT EXISTS tsv tsvector GENERATED ALWAYS AS "
+    "(to_tsvector('english', coalesce(vendor, '') || ' ' || coalesce(raw_text, ''))) STORED",
+    "CREATE INDEX IF NOT EXISTS receipts_tsv_gin ON receipts USING gin (tsv)",
+]
+for statement in TSV_DDL:
+    event.listen(Receipt.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+
+receipt_tsv = literal_column("receipts.tsv", type_=TSVECTOR)
+
+# External-content FTS5 index over vendor, raw text and category (SQLite only), kept in sync by triggers
+# The trigram tokenizer answers case-insensitive substring matches, the same rows as ILIKE '%term%'
+FTS_COLUMNS = "vendor, raw_text, category"
+FTS_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS receipts_fts USING fts5({FTS_COLUMNS}, "
+    "content='receipts', content_rowid='id', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS receipts_fts_insert AFTER INSERT ON receipts BEGIN "
+    f"INSERT INTO receipts_fts(rowid, {FTS_COLUMNS}) VALUES (new.id, new.vendor, new.raw_text, new.category); END",
+    f"CREATE TRIGGER IF NOT EXISTS receipts_fts_delete AFTER DELETE ON receipts BEGIN "
+    f"INSERT INTO receipts_fts(receipts_fts, rowid, {FTS_COLUMNS}) "
+    "VALUES ('delete', old.id, old.vendor, old.raw_text, old.category); END",
+    f"CREATE TRIGGER IF NOT EXISTS receipts_fts_update AFTER UPDATE OF {FTS_COLUMNS} ON receipts BEGIN "
+    f"INSERT INTO receipts_fts(receipts_fts, rowid, {FTS_COLUMNS}) "
+    "VALUES ('delete', old.id, old.vendor, old.raw_text, old.category); "
+    f"INSERT INTO receipts_fts(rowid, {FTS_COLUMNS}) VALUES (new.id, new.vendor, new.raw_text, new.category); END",
+]
+for statement in FTS_DDL:
+    event.listen(Receipt.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+
+# Not part of the metadata, so create_all leaves it to the DDL above; rowid is the receipt id
+receipts_fts = table("receipts_fts", column("rowid", Integer), column("rank"))
+receipts_fts_match = literal_column("receipts_fts").op("MATCH")
+
+# Lightweight projection of the columns needed for aggregation and indexing
+# raw_text is only loaded when building the keyword index
+ReceiptRow = namedtuple(
+    "ReceiptRow",
+    "id vendor category amount transaction_date raw_text",
+    defaults=(None,)
+)
+
 # Create tables
 def create_tables():
     Base.metadata.create_all(bind=engine)
+    add_missing_columns()
+
+def add_missing_columns():
+    """Add columns and indexes introduced after a database file was first created (create_all only adds tables)"""
+    inspector = inspect(engine)
+    columns = {column['name'] for column in inspector.get_columns(Receipt.__tablename__)}
+    if engine.dialect.name == 'postgresql' and 'tsv' not in columns:
+        with engine.begin() as connection:
+            for statement in TSV_DDL:
+                connection.execute(text(statement))
+    if engine.dialect.name == 'sqlite' and 'receipts_fts' not in inspector.get_table_names():
+        with engine.begin() as connection:
+            for statement in FTS_DDL:
+                connection.execute(text(statement))
+            # Index the receipts already stored
+            connection.execute(text("INSERT INTO receipts_fts(receipts_fts) VALUES ('rebuild')"))
+    if 'content_hash' not in columns:
+        with engine.begin() as connection:
+            connection.execute(text("ALTER TABLE receipts ADD COLUMN content_hash VARCHAR(64)"))
+            connection.execute(text(
+                "CREATE UNIQUE INDEX IF NOT EXISTS ix_receipts_content_hash ON receipts (content_hash)"
+            ))
+    # IF NOT EXISTS rather than checkfirst: reflection does not report expression indexes
+    with engine.begin() as connection:
+        for index in Receipt.__table__.indexes:
+            connection.execute(CreateIndex(index, if_not_exists=True))
 
 # Database dependency for FastAPI
 def get_db():
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, validator, Field
+from pydantic import BaseModel, ConfigDict, Field, ValidationInfo, field_validator
 from datetime import datetime
 from typing import Optional, List
 from enum import Enum
@@ -23,16 +23,11 @@ class ReceiptBase(BaseModel):
     file_type: FileType
     vendor: Optional[str] = Field(None, max_length=255)
     transaction_date: Optional[datetime] = None
-    amount: Optional[float] = Field(None, ge=0)  # Amount must be >= 0
+    amount: Optional[float] = Field(None, ge=0)  # Amount must be >= 0, checked in pydantic-core
     category: Optional[str] = Field(None, max_length=100)
     
-    @validator('amount')
-    def validate_amount(cls, v):
-        if v is not None and v < 0:
-            raise ValueError('Amount must be non-negative')
-        return v
-    
-    @validator('filename')
+    @field_validator('filename')
+    @classmethod
     def validate_filename(cls, v):
         if not v.strip():
             raise ValueError('Filename cannot be empty')
@@ -61,8 +56,14 @@ class ReceiptResponse(ReceiptBase):
     processing_status: ProcessingStatus
     error_message: Optional[str] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+class UploadJobStatus(BaseModel):
+    """Schema for background upload job status"""
+    job_id: str
+    status: str = Field(..., pattern="^(queued|processing|done|failed)$")
+    receipt_id: Optional[int] = None
+    error: Optional[str] = None
 
 class SearchFilters(BaseModel):
     """Schema for search and filtering parameters"""
@@ -74,10 +75,11 @@ class SearchFilters(BaseModel):
     end_date: Optional[datetime] = None
     keyword: Optional[str] = None  # For text search in vendor/raw_text
     
-    @validator('max_amount')
-    def validate_amount_range(cls, v, values):
-        if v is not None and 'min_amount' in values and values['min_amount'] is not None:
-            if v < values['min_amount']:
+    @field_validator('max_amount')
+    @classmethod
+    def validate_amount_range(cls, v, info: ValidationInfo):
+        if v is not None and info.data.get('min_amount') is not None:
+            if v < info.data['min_amount']:
                 raise ValueError('max_amount must be greater than or equal to min_amount')
         return v
 
@@ -96,7 +98,7 @@ class ManualCorrectionRequest(BaseModel):
     
 class ExportRequest(BaseModel):
     """Schema for export requests"""
-    format: str = Field(..., pattern="^(csv|json)$")
+    format: str = Field(..., pattern="^(csv|json|parquet)$")
     filters: Optional[SearchFilters] = None
     include_fields: Optional[List[str]] = None
     
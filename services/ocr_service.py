@@ -4,13 +4,17 @@ import numpy as np
 from PIL import Image
 import PyPDF2
 import pdfplumber
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Union
 import logging
+import io
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# A file to extract text from: a path on disk, or the file's bytes already in memory
+FileSource = Union[str, bytes]
+
 class OCRService:
     """Service for extracting text from various file formats"""
     
@@ -35,19 +39,26 @@ class OCRService:
         # Default language combination for better accuracy
         self.default_lang_config = 'eng+spa+fra'  # English, Spanish, French
     
-    def detect_language(self, image_path: str) -> str:
+    def detect_language(self, image_path: FileSource) -> str:
         """
         Detect the primary language in an image using OCR
         Returns: language code (e.g., 'eng', 'spa', 'fra')
         """
         try:
-            image = cv2.imread(image_path)
+            image = self._load_image(image_path)
             if image is None:
                 return 'eng'  # Default to English
             
             processed_image = self._preprocess_image(image)
-            pil_image = Image.fromarray(processed_image)
-            
+            return self._detect_language_from_image(Image.fromarray(processed_image))
+                
+        except Exception as e:
+            logger.warning(f"Language detection failed for {self._source_label(image_path)}: {str(e)}")
+            return 'eng'
+    
+    def _detect_language_from_image(self, pil_image: Image.Image) -> str:
+        """Detect the primary language of an already preprocessed image"""
+        try:
             # Try to detect language using Tesseract's built-in language detection
             try:
                 # Get orientation and script detection info
@@ -85,19 +96,29 @@ class OCRService:
                 return 'eng'
                 
         except Exception as e:
-            logger.warning(f"Language detection failed for {image_path}: {str(e)}")
+            logger.warning(f"Language detection failed: {str(e)}")
             return 'eng'
     
-    def extract_text_from_image(self, image_path: str) -> Tuple[str, float]:
+    def _load_image(self, source: FileSource) -> Optional[np.ndarray]:
+        """Decode an image from a path or in-memory bytes (None if it cannot be decoded)"""
+        if isinstance(source, bytes):
+            return cv2.imdecode(np.frombuffer(source, dtype=np.uint8), cv2.IMREAD_COLOR)
+        return cv2.imread(source)
+    
+    def _source_label(self, source: FileSource) -> str:
+        """Describe a file source for log messages"""
+        return source if isinstance(source, str) else f"<{len(source)} bytes>"
+    
+    def extract_text_from_image(self, image_path: FileSource) -> Tuple[str, float]:
         """
         Extract text from image files (.jpg, .png) using OCR with multi-language support
         Returns: (extracted_text, confidence_score)
         """
         try:
             # Load and preprocess image
-            image = cv2.imread(image_path)
+            image = self._load_image(image_path)
             if image is None:
-                raise ValueError(f"Could not load image: {image_path}")
+                raise ValueError(f"Could not load image: {self._source_label(image_path)}")
             
             # Preprocess image for better OCR accuracy
             processed_image = self._preprocess_image(image)
@@ -105,8 +126,8 @@ class OCRService:
             # Convert to PIL Image for Tesseract
             pil_image = Image.fromarray(processed_image)
             
-            # Detect primary language
-            detected_lang = self.detect_language(image_path)
+            # Detect primary language from the image already decoded and preprocessed
+            detected_lang = self._detect_language_from_image(pil_image)
             
             # Create language configuration based on detection
             if detected_lang == 'spa':
@@ -131,11 +152,11 @@ class OCRService:
             avg_confidence = sum(confidences) / len(confidences) if confidences else 0
             confidence_score = avg_confidence / 100.0  # Convert to 0-1 range
             
-            logger.info(f"OCR completed for {image_path}, language: {detected_lang}, confidence: {confidence_score:.2f}")
+            logger.info(f"OCR completed for {self._source_label(image_path)}, language: {detected_lang}, confidence: {confidence_score:.2f}")
             return text.strip(), confidence_score
             
         except Exception as e:
-            logger.error(f"OCR failed for {image_path}: {str(e)}")
+            logger.error(f"OCR failed for {self._source_label(image_path)}: {str(e)}")
             return "", 0.0
     
     def _preprocess_image(self, image: np.ndarray) -> np.ndarray:
@@ -159,56 +180,77 @@ class OCRService:
         
         return cleaned
     
-    def extract_text_from_pdf(self, pdf_path: str) -> Tuple[str, float]:
+    def extract_text_from_pdf(self, pdf_path: FileSource) -> Tuple[str, float]:
         """
         Extract text from PDF files
         Returns: (extracted_text, confidence_score)
         """
+        label = self._source_label(pdf_path)
         try:
             text = ""
             
             # Try pdfplumber first (better for structured PDFs)
             try:
-                with pdfplumber.open(pdf_path) as pdf:
-                    for page in pdf.pages:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text += page_text + "\n"
+                text, _ = self.extract_pdf_pages(pdf_path)
                 
                 if text.strip():
-                    logger.info(f"PDF text extracted using pdfplumber: {pdf_path}")
+                    logger.info(f"PDF text extracted using pdfplumber: {label}")
                     return text.strip(), 1.0  # High confidence for direct text extraction
                     
             except Exception as e:
-                logger.warning(f"pdfplumber failed for {pdf_path}: {str(e)}")
+                logger.warning(f"pdfplumber failed for {label}: {str(e)}")
             
             # Fallback to PyPDF2
             try:
-                with open(pdf_path, 'rb') as file:
+                with self._open_binary(pdf_path) as file:
                     pdf_reader = PyPDF2.PdfReader(file)
                     for page in pdf_reader.pages:
                         text += page.extract_text() + "\n"
                 
                 if text.strip():
-                    logger.info(f"PDF text extracted using PyPDF2: {pdf_path}")
+                    logger.info(f"PDF text extracted using PyPDF2: {label}")
                     return text.strip(), 0.9  # Slightly lower confidence
                     
             except Exception as e:
-                logger.warning(f"PyPDF2 failed for {pdf_path}: {str(e)}")
+                logger.warning(f"PyPDF2 failed for {label}: {str(e)}")
             
             # If no text extracted, return empty
-            logger.warning(f"No text could be extracted from PDF: {pdf_path}")
+            logger.warning(f"No text could be extracted from PDF: {label}")
             return "", 0.0
             
         except Exception as e:
-            logger.error(f"PDF processing failed for {pdf_path}: {str(e)}")
+            logger.error(f"PDF processing failed for {label}: {str(e)}")
             return "", 0.0
     
-    def extract_text_from_txt(self, txt_path: str) -> Tuple[str, float]:
+    def extract_pdf_pages(self, pdf_path: FileSource, start: int = 0, stop: Optional[int] = None) -> Tuple[str, int]:
+        """
+        Extract text from pages [start, stop) of a PDF with pdfplumber, one line block per non-empty page
+        Page ranges extracted separately concatenate to the whole document's text
+        Returns: (extracted_text, total page count)
+        """
+        text = ""
+        # pdfplumber leaves streams it was given open, so the file is closed here
+        with self._open_binary(pdf_path) as file, pdfplumber.open(file) as pdf:
+            for page in pdf.pages[start:stop]:
+                page_text = page.extract_text()
+                if page_text:
+                    text += page_text + "\n"
+            return text, len(pdf.pages)
+    
+    def _open_binary(self, source: FileSource):
+        """Open a path for binary reading, or wrap in-memory bytes in a file-like object"""
+        if isinstance(source, bytes):
+            return io.BytesIO(source)
+        return open(source, 'rb')
+    
+    def extract_text_from_txt(self, txt_path: FileSource) -> Tuple[str, float]:
         """
         Extract text from plain text files
         Returns: (extracted_text, confidence_score)
         """
+        if isinstance(txt_path, bytes):
+            return self._decode_text(txt_path)
+        
         try:
             with open(txt_path, 'r', encoding='utf-8') as file:
                 text = file.read()
@@ -234,9 +276,23 @@ class OCRService:
             logger.error(f"Text file processing failed for {txt_path}: {str(e)}")
             return "", 0.0
     
-    def extract_text(self, file_path: str, file_type: str) -> Tuple[str, float]:
+    def _decode_text(self, content: bytes) -> Tuple[str, float]:
+        """Decode in-memory text bytes, trying the same encodings as file reads"""
+        for encoding in ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']:
+            try:
+                text = content.decode(encoding)
+                logger.info(f"Text content processed with {encoding} encoding: {self._source_label(content)}")
+                return text.strip(), 1.0  # Perfect confidence for plain text
+            except UnicodeDecodeError:
+                continue
+        
+        logger.error(f"Could not decode text content: {self._source_label(content)}")
+        return "", 0.0
+    
+    def extract_text(self, file_path: FileSource, file_type: str) -> Tuple[str, float]:
         """
         Main method to extract text based on file type
+        file_path may also be the file's bytes, so an upload need not be re-read from disk
         Returns: (extracted_text, confidence_score)
         """
         file_type = file_type.lower()
@@ -250,3 +306,26 @@ class OCRService:
         else:
             logger.error(f"Unsupported file type: {file_type}")
             return "", 0.0
+
+# One service per OCR worker process, created on first use in that process
+_worker_service: Optional[OCRService] = None
+
+def extract_text_in_worker(file_path: FileSource, file_type: str) -> Tuple[str, float]:
+    """
+    Module-level entry point for process-pool OCR (bound methods of a shared service are not submitted)
+    Returns: (extracted_text, confidence_score)
+    """
+    global _worker_service
+    if _worker_service is None:
+        _worker_service = OCRService()
+    return _worker_service.extract_text(file_path, file_type)
+
+def extract_pdf_pages_in_worker(pdf_path: FileSource, start: int, stop: int) -> Tuple[str, int]:
+    """
+    Process-pool entry point for extracting one range of a PDF's pages
+    Returns: (extracted_text, total page count)
+    """
+    global _worker_service
+    if _worker_service is None:
+        _worker_service = OCRService()
+    return _worker_service.extract_pdf_pages(pdf_path, start, stop)
@@ -0,0 +1,108 @@
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Tuple
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from models.database import Receipt
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class ReceiptBatchWriter:
+    """
+    Coalesces receipt inserts from concurrent uploads into shared commits
+    A background thread drains up to max_batch queued rows, or whatever arrives within max_delay seconds,
+    and writes them in one transaction so N simultaneous uploads cost one commit instead of N
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], max_batch: int = 64, max_delay: float = 0.01):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._pending = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, values: Dict[str, Any]) -> int:
+        """
+        Queue one receipt's column values and block until it is committed
+        Returns the new receipt id; raises the insert's exception (e.g. IntegrityError) if it failed
+        """
+        self._ensure_started()
+        future = Future()
+        self._pending.put((values, future))
+        return future.result()
+
+    def _ensure_started(self):
+        """Start the writer thread on first use"""
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="receipt-batch-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        """Writer loop: wait for a row, gather a batch, write it"""
+        while True:
+            batch = [self._pending.get()]
+            deadline = time.monotonic() + self.max_delay
+
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                # Never leave a submitter waiting, and keep the writer thread alive
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _write_batch(self, batch: List[Tuple[Dict[str, Any], Future]]):
+        """Insert a batch in one transaction; if it fails, retry each row alone so one bad row fails only itself"""
+        db = self.session_factory()
+        try:
+            try:
+                receipt_ids = self._insert_rows(db, [values for values, _ in batch])
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                if len(batch) == 1:
+                    batch[0][1].set_exception(e)
+                    return
+
+                logger.warning(f"Batched receipt insert failed, retrying {len(batch)} rows individually: {str(e)}")
+                for item in batch:
+                    self._write_batch([item])
+                return
+
+            for receipt_id, (_, future) in zip(receipt_ids, batch):
+                future.set_result(receipt_id)
+
+            if len(batch) > 1:
+                logger.info(f"Committed {len(batch)} receipts in one batch")
+        finally:
+            db.close()
+
+    def _insert_rows(self, db: Session, rows: List[Dict[str, Any]]) -> List[int]:
+        """
+        Insert rows with one bulk INSERT ... RETURNING (no ORM objects or per-row unit of work)
+        Returns the new ids in row order
+        """
+        hashes = [values.get('content_hash') for values in rows]
+        if all(hashes):
+            # Unordered RETURNING lets SQLite send one multi-row VALUES statement;
+            # the unique content hash maps each returned id back to its row
+            returned = db.execute(insert(Receipt).returning(Receipt.content_hash, Receipt.id), rows).all()
+            ids_by_hash = dict(returned)
+            return [ids_by_hash[content_hash] for content_hash in hashes]
+
+        # Without a per-row key, ask for parameter order (some backends then insert row by row)
+        return db.scalars(insert(Receipt).returning(Receipt.id, sort_by_parameter_order=True), rows).all()
@@ -47,8 +47,12 @@ def check_dependencies():
     """Check if required dependencies are installed"""
     required_packages = [
         'fastapi', 'uvicorn', 'streamlit', 'sqlalchemy', 
-        'pydantic', 'pytesseract', 'opencv-python', 'pillow'
+        'pydantic', 'pytesseract', 'opencv-python', 'pillow', 'rapidfuzz',
+        'diskcache', 'pandas', 'pyarrow', 'orjson', 'httptools'
     ]
+    # uvicorn runs on uvloop when it is installed; it has no Windows build
+    if sys.platform != 'win32':
+        required_packages.append('uvloop')
     
     missing_packages = []
     for package in required_packages: